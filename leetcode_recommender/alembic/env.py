@@ -1,4 +1,6 @@
+import sys
 from logging.config import fileConfig
+from pathlib import Path
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
@@ -14,11 +16,17 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# add your model's MetaData object here
-# for 'autogenerate' support
-# from myapp import mymodel
-# target_metadata = mymodel.Base.metadata
-target_metadata = None
+# the backend package lives two levels up (repo root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.database.models import metadata  # noqa: E402
+
+target_metadata = metadata
+
+# use the backend's config.json unless alembic.ini / -x was pointed elsewhere
+if config.get_main_option("sqlalchemy.url", "").startswith("driver://"):
+    from src.database.db_config import database_url  # noqa: E402
+
+    config.set_main_option("sqlalchemy.url", database_url().replace("%", "%%"))
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
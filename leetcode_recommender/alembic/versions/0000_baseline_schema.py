@@ -0,0 +1,90 @@
+"""baseline schema
+
+Creates users, problems and interactions in the shape the API has always
+used, skipping any table that already exists, so databases created by hand
+can be stamped and upgraded the same way as fresh ones. Indexes beyond the
+primary keys come in later revisions. The tables this revision does create
+carry CREATED_BY as their table comment, and downgrade drops only those.
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0000'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CREATED_BY = "alembic 0000"
+
+
+def _missing(table: str) -> bool:
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def _created_here(table: str) -> bool:
+    row = op.get_bind().execute(
+        sa.text(
+            "SELECT TABLE_COMMENT FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+        ),
+        {"table": table},
+    ).first()
+    return row is not None and row[0] == CREATED_BY
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _missing("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("username", sa.String(30), nullable=False),
+            sa.Column("email", sa.String(255), nullable=True),
+            sa.Column("password_hash", sa.String(255), nullable=True),
+            sa.Column("experience_level", sa.String(20), nullable=True),
+            sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.current_timestamp()),
+            comment=CREATED_BY,
+        )
+    if _missing("problems"):
+        op.create_table(
+            "problems",
+            sa.Column("problem_id", sa.Integer, primary_key=True, autoincrement=False),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("tags", sa.Text, nullable=True),
+            sa.Column("difficulty", sa.String(16), nullable=True),
+            sa.Column("acceptance", sa.Float, nullable=True),
+            sa.Column("likes", sa.Integer, nullable=True),
+            sa.Column("dislikes", sa.Integer, nullable=True),
+            comment=CREATED_BY,
+        )
+    if _missing("interactions"):
+        op.create_table(
+            "interactions",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("problem_id", sa.Integer, nullable=False),
+            sa.Column("problem_title", sa.String(255), nullable=True),
+            sa.Column("tags", sa.Text, nullable=True),
+            sa.Column("difficulty", sa.String(16), nullable=True),
+            sa.Column("status", sa.String(16), nullable=True),
+            sa.Column("rating", sa.Integer, nullable=True),
+            sa.Column("solved_at", sa.DateTime, nullable=False, server_default=sa.func.current_timestamp()),
+            comment=CREATED_BY,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("interactions", "problems", "users"):
+        if _created_here(table):
+            op.drop_table(table)
@@ -0,0 +1,41 @@
+"""unique (user_id, problem_id) key on interactions
+
+Backs the single-statement INSERT ... ON DUPLICATE KEY UPDATE used by
+/user/mark-solved. Duplicate rows left by the old select-then-insert path
+are collapsed to the most recent one first.
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = '0000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        DELETE older FROM interactions AS older
+        JOIN interactions AS newer
+          ON newer.user_id = older.user_id
+         AND newer.problem_id = older.problem_id
+         AND newer.id > older.id
+        """
+    )
+    op.create_unique_constraint("uq_interactions_user_problem", "interactions", ["user_id", "problem_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("uq_interactions_user_problem", "interactions", type_="unique")
@@ -0,0 +1,73 @@
+"""indexes for the users and interactions hot queries
+
+    interactions WHERE user_id = ? ORDER BY solved_at, id  -> ix_interactions_user_solved_at
+    users WHERE username = ? OR email = ?                  -> uq_users_username, uq_users_email
+
+The user lookup ORs two columns, so each needs its own index for MySQL to
+use an index-merge union instead of scanning users. Indexes already present
+under another name (hand-made schemas) are left alone. The ones this
+revision does create carry CREATED_BY as their index comment, and downgrade
+drops only those.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CREATED_BY = "alembic 0002"
+
+
+def _has_index(table: str, columns) -> bool:
+    """True if some index (or unique constraint) on `table` starts with `columns`."""
+    inspector = sa.inspect(op.get_bind())
+    indexes = inspector.get_indexes(table) + inspector.get_unique_constraints(table)
+    return any(list(ix["column_names"][:len(columns)]) == list(columns) for ix in indexes)
+
+
+def _create(name: str, table: str, columns, unique: bool = False):
+    op.execute(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({', '.join(columns)}) "
+        f"COMMENT '{CREATED_BY}'"
+    )
+
+
+def _created_here(table: str, name: str) -> bool:
+    row = op.get_bind().execute(
+        sa.text(
+            "SELECT INDEX_COMMENT FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_NAME = :name LIMIT 1"
+        ),
+        {"table": table, "name": name},
+    ).first()
+    return row is not None and row[0] == CREATED_BY
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _has_index("interactions", ["user_id", "solved_at"]):
+        _create("ix_interactions_user_solved_at", "interactions", ["user_id", "solved_at", "id"])
+    if not _has_index("users", ["username"]):
+        _create("uq_users_username", "users", ["username"], unique=True)
+    if not _has_index("users", ["email"]):
+        _create("uq_users_email", "users", ["email"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, name in (("users", "uq_users_email"), ("users", "uq_users_username"),
+                        ("interactions", "ix_interactions_user_solved_at")):
+        if _created_here(table, name):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,31 @@
+"""content hash on problems
+
+Lets db_insert.insert_problems_from_csv skip rows whose content has not
+changed since the last load.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("problems", sa.Column("content_hash", sa.String(16), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("problems", "content_hash")
@@ -0,0 +1,32 @@
+"""token version on users
+
+Every access token carries the user's token_version as its "tv" claim;
+logout bumps the column, so older tokens are rejected by every API worker
+and the revocation survives restarts.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("users", sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "token_version")
@@ -84,6 +84,12 @@ def solved_page() -> rx.Component:
                 ),
             ),
 
+            rx.cond(
+                UserState.next_cursor != "",
+                rx.button("Load more", on_click=UserState.load_more_progress, size="2", variant="soft"),
+                rx.fragment(),
+            ),
+
             spacing="6",
             padding="2em",
             align_items="center",
@@ -4,6 +4,7 @@ from typing import List, Dict, Optional
 from leetcode_recommender.states.auth_state import AuthState
 
 BASE_URL = "http://127.0.0.1:8100/user"
+PROGRESS_PAGE_SIZE = 50
 
 
 class SolvedProblem(rx.Base):
@@ -25,6 +26,7 @@ class UserState(rx.State):
 
     solved_status: Dict[int, bool] = {}
     topic_groups: List[TopicGroup] = []
+    next_cursor: str = ""  # set while older solved problems remain on the server
     error: str = ""
 
     def _auth_headers(self) -> Dict[str, str]:
@@ -51,17 +53,18 @@ class UserState(rx.State):
             )
 
             if res.status_code == 200:
+                was_solved = self.solved_status.get(problem_id, False)
                 self.solved_status[problem_id] = True
                 self.solved_status = self.solved_status.copy()
                 self.error = ""
-                self.fetch_progress()
+                self._add_to_groups(problem_id, title, tags, difficulty, was_solved)
             else:
                 self.error = f"mark_solved failed: {res.status_code} {res.text}"
 
         except Exception as e:
             self.error = f"mark_solved exception: {e}"
 
-    def unmark_solved(self, problem_id: int):
+    def unmark_solved(self, problem_id: int, tags: str = ""):
         """Undo mark solved."""
         try:
             payload = {"problem_id": int(problem_id)}
@@ -75,12 +78,55 @@ class UserState(rx.State):
                 self.solved_status[problem_id] = False
                 self.solved_status = self.solved_status.copy()
                 self.error = ""
-                self.fetch_progress()
+                self._remove_from_groups(problem_id, tags)
             else:
                 self.error = f"unmark_solved failed: {res.status_code} {res.text}"
         except Exception as e:
             self.error = f"unmark_solved exception: {e}"
 
+    @staticmethod
+    def _split_tags(tags: str) -> List[str]:
+        return [t.strip().lower() for t in (tags or "").split(",") if t.strip()]
+
+    def _add_to_groups(self, problem_id: int, title: str, tags: str, difficulty: str, was_solved: bool = False):
+        """Apply a new solve to topic_groups locally instead of re-fetching progress.
+
+        Groups only hold the pages loaded so far, so counts (server totals)
+        are adjusted by one rather than recomputed from the loaded problems.
+        """
+        if was_solved:
+            self._remove_from_groups(problem_id, tags)
+        solved = SolvedProblem(problem_id=problem_id, problem_title=title, tags=tags, difficulty=difficulty)
+        groups = {g.tag: g for g in self.topic_groups}
+        for tag in self._split_tags(tags):
+            group = groups.get(tag)
+            if group is None:
+                group = groups[tag] = TopicGroup(tag=tag)
+            group.problems = [solved] + group.problems
+            group.count += 1
+        self.topic_groups = list(groups.values())
+
+    def _remove_from_groups(self, problem_id: int, tags: str = ""):
+        known_tags = set(self._split_tags(tags))
+        groups = []
+        for group in self.topic_groups:
+            problems = [p for p in group.problems if p.problem_id != problem_id]
+            count = group.count
+            if len(problems) != len(group.problems) or group.tag in known_tags:
+                count -= 1
+            if count > 0:
+                groups.append(TopicGroup(tag=group.tag, count=count, problems=problems))
+        self.topic_groups = groups
+
+    def _is_solved(self, problem_id: int) -> bool:
+        """Solved state for one problem; asks the server for problems outside the loaded pages."""
+        if problem_id in self.solved_status:
+            return self.solved_status[problem_id]
+        res = requests.get(f"{BASE_URL}/is-solved/{problem_id}", headers=self._auth_headers(), timeout=10)
+        solved = res.status_code == 200 and bool(res.json().get("solved"))
+        self.solved_status[problem_id] = solved
+        return solved
+
     def toggle_solved(self, problem):
         """Receive full problem object from frontend safely."""
         try:
@@ -93,56 +139,85 @@ class UserState(rx.State):
             return
 
         print(f"[DEBUG] toggle_solved CALLED from UI -> problem_id={problem_id} | title={title}")
-        if self.solved_status.get(problem_id, False):
-            self.unmark_solved(problem_id)
+        try:
+            solved = self._is_solved(problem_id)
+        except Exception as e:
+            self.error = f"toggle_solved exception: {e}"
+            return
+        if solved:
+            self.unmark_solved(problem_id, tags)
         else:
             self.mark_solved(problem_id, title, tags, difficulty)
 
-    def fetch_progress(self):
-        """Pull user's solved data from backend."""
-        try:
-            res = requests.get(
-                f"{BASE_URL}/progress",
-                headers=self._auth_headers(),
-                timeout=10,
+    def _fetch_progress_page(self, cursor: str = "") -> Optional[dict]:
+        params = {"limit": PROGRESS_PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        res = requests.get(
+            f"{BASE_URL}/progress",
+            params=params,
+            headers=self._auth_headers(),
+            timeout=10,
+        )
+        if res.status_code != 200:
+            self.error = f"Progress fetch failed: {res.status_code} {res.text}"
+            return None
+        return res.json()
+
+    def _merge_progress_page(self, data: dict):
+        """Append one page of problems to the topic groups (counts come from the server summary)."""
+        problems = {
+            p["problem_id"]: SolvedProblem(
+                problem_id=p["problem_id"],
+                problem_title=p.get("title") or "Untitled",
+                tags=", ".join(p.get("tags") or []),
+                difficulty=p.get("difficulty") or "Unknown",
+                solved_at=p.get("solved_at") or "",
             )
+            for p in data.get("problems") or []
+        }
+        tag_ids = data.get("tag_problem_ids") or {}
+        groups = {g.tag: g for g in self.topic_groups}
+        for topic in data.get("topics") or []:
+            group = groups.setdefault(topic["tag"], TopicGroup(tag=topic["tag"]))
+            group.count = topic["count"]
+        for tag, ids in tag_ids.items():
+            group = groups.setdefault(tag, TopicGroup(tag=tag, count=len(ids)))
+            group.problems = group.problems + [problems[pid] for pid in ids if pid in problems]
+        self.topic_groups = list(groups.values())
+        for pid in problems:
+            self.solved_status[pid] = True
+        self.solved_status = self.solved_status.copy()
+        self.next_cursor = data.get("next_cursor") or ""
 
-            if res.status_code != 200:
-                self.topic_groups = []
-                self.error = f"Progress fetch failed: {res.status_code} {res.text}"
+    def fetch_progress(self):
+        """Load the newest page of the user's solved problems (older ones via load_more_progress)."""
+        try:
+            self.topic_groups = []
+            self.solved_status = {}
+            self.next_cursor = ""
+            data = self._fetch_progress_page()
+            if data is None:
                 return
-
-            data = res.json()
-            topics = data.get("topics") or []
-
-            new_groups: List[TopicGroup] = []
-            for group in topics:
-                tag = group.get("tag") or "Unknown"
-                problems_data = group.get("problems") or []
-                problems = [
-                    SolvedProblem(
-                        problem_id=p.get("problem_id")
-                        or p.get("frontend_id"),
-                        problem_title=p.get("problem_title")
-                        or p.get("title")
-                        or "Untitled",
-                        tags=p.get("tags") or p.get("topic_tags") or "",
-                        difficulty=p.get("difficulty") or "Unknown",
-                        solved_at=p.get("solved_at") or "",
-                    )
-                    for p in problems_data
-                ]
-                new_groups.append(
-                    TopicGroup(tag=tag, count=len(problems), problems=problems)
-                )
-
-            self.topic_groups = new_groups
+            self._merge_progress_page(data)
             self.error = ""
-
         except Exception as e:
             self.topic_groups = []
             self.error = f"fetch_progress: {e}"
 
+    def load_more_progress(self):
+        """Fetch the next page of older solved problems, if any."""
+        if not self.next_cursor:
+            return
+        try:
+            data = self._fetch_progress_page(self.next_cursor)
+            if data is None:
+                return
+            self._merge_progress_page(data)
+            self.error = ""
+        except Exception as e:
+            self.error = f"load_more_progress: {e}"
+
     @rx.var
     def solved_ids(self) -> List[int]:
         return [pid for pid, solved in self.solved_status.items() if solved]
@@ -150,4 +225,5 @@ class UserState(rx.State):
     def reset_state(self):
         self.solved_status = {}
         self.topic_groups = []
+        self.next_cursor = ""
         self.error = ""
@@ -1,7 +1,13 @@
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 import pandas as pd
+import hashlib
 import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.modeling.dataset_store import load_dataset
 
 app = FastAPI(
     title="LeetCode Analytics API",
@@ -11,10 +17,15 @@ app = FastAPI(
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, "../../data/processed/preprocessed_data.csv")
+# only what the endpoints use; skips the HTML descriptions
+ANALYTICS_COLUMNS = ["frontend_id", "title", "likes", "acceptance", "difficulty", "topic_tags"]
+RELOAD_INTERVAL = float(os.getenv("ANALYTICS_RELOAD_INTERVAL", 5))
+DEFAULT_TREND_BINS = 10
+MAX_TREND_BINS = 200
 
-def load_data():
+def load_data(columns: Optional[List[str]] = None, path: str = DATA_PATH):
     try:
-        df = pd.read_csv(DATA_PATH)
+        df = load_dataset(path, columns)  # columnar bundle when present, else the CSV
         if df.empty:
             raise RuntimeError("Dataset is empty.")
         # Convert numeric fields safely
@@ -23,10 +34,155 @@ def load_data():
                 df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
         return df
     except FileNotFoundError:
-        raise RuntimeError(f"Data file not found at path: {DATA_PATH}")
+        raise RuntimeError(f"Data file not found at path: {path}")
     except Exception as e:
         raise RuntimeError(f"Error loading data: {e}")
 
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _acceptance_trends(acceptance: pd.Series, bins: int) -> dict:
+    hist, edges = pd.cut(acceptance, bins=bins, retbins=True)
+    counts = hist.value_counts().sort_index().to_dict()
+    bins_list = [
+        f"{round(edges[i], 2)} - {round(edges[i + 1], 2)}"
+        for i in range(len(edges) - 1)
+    ]
+    return {bins_list[i]: list(counts.values())[i] for i in range(len(bins_list))}
+
+
+class AnalyticsSnapshot(NamedTuple):
+    """Every aggregate the endpoints serve, computed once per version of the data file."""
+    signature: Tuple[int, int]            # (mtime_ns, size) when loaded
+    digest: str                           # sha1 of the file contents
+    loaded_at: float
+    stats: dict
+    difficulty_distribution: dict
+    tag_frequency: List[Tuple[str, int]]  # all tags, most frequent first
+    popular: List[dict]                   # all problems by likes, descending
+    acceptance: pd.Series                 # kept for non-default trend bins
+    trends: Dict[int, dict]               # bins -> acceptance histogram, filled lazily
+
+
+def build_snapshot(path: str = DATA_PATH, signature=None, digest=None) -> AnalyticsSnapshot:
+    signature = signature or _file_signature(path)
+    digest = digest or _file_digest(path)
+    df = load_data(ANALYTICS_COLUMNS, path)
+
+    stats = {
+        "total_problems": len(df),
+        "average_acceptance": round(df["acceptance"].mean(), 2) if "acceptance" in df else 0,
+        "difficulty_breakdown": {
+            level.lower(): int((df["difficulty"] == level).sum()) if "difficulty" in df else 0
+            for level in ("Easy", "Medium", "Hard")
+        },
+    }
+    difficulty = df["difficulty"].value_counts().to_dict() if "difficulty" in df.columns else None
+
+    tag_frequency = None
+    if "topic_tags" in df.columns:
+        all_tags = []
+        for row in df["topic_tags"].dropna().astype(str):
+            all_tags.extend([
+                t.strip() for t in row.strip("[]").replace("'", "").split(",") if t.strip()
+            ])
+        tag_frequency = list(pd.Series(all_tags).value_counts().items())
+
+    popular_cols = ["frontend_id", "title", "likes", "acceptance", "difficulty"]
+    popular = None
+    if all(col in df.columns for col in popular_cols):
+        popular = df.sort_values("likes", ascending=False)[popular_cols].to_dict(orient="records")
+
+    acceptance = df["acceptance"] if "acceptance" in df.columns else None
+    trends = {DEFAULT_TREND_BINS: _acceptance_trends(acceptance, DEFAULT_TREND_BINS)} if acceptance is not None else {}
+
+    return AnalyticsSnapshot(signature, digest, time.time(), stats, difficulty, tag_frequency, popular,
+                             acceptance, trends)
+
+
+class SnapshotHolder:
+    """Current snapshot plus a background thread that swaps in a new one when the file changes.
+
+    Readers only dereference `current`; a reload builds the replacement off
+    to the side and publishes it with a single assignment. A failed reload
+    keeps serving the previous snapshot.
+    """
+
+    def __init__(self, path: str = DATA_PATH, interval: float = RELOAD_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.current: Optional[AnalyticsSnapshot] = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def get(self) -> AnalyticsSnapshot:
+        snapshot = self.current
+        if snapshot is None:
+            with self._lock:
+                if self.current is None:
+                    self.current = build_snapshot(self.path)
+                snapshot = self.current
+        return snapshot
+
+    def refresh(self) -> bool:
+        """Rebuild if the file's mtime/size changed and its contents differ; True if swapped."""
+        try:
+            signature = _file_signature(self.path)
+        except OSError as e:
+            print(f"[WARN] Analytics data unavailable ({e}); keeping current snapshot.")
+            return False
+        snapshot = self.current
+        if snapshot is not None and snapshot.signature == signature:
+            return False
+        with self._lock:
+            try:
+                digest = _file_digest(self.path)
+                if snapshot is not None and snapshot.digest == digest:
+                    self.current = snapshot._replace(signature=signature)
+                    return False
+                self.current = build_snapshot(self.path, signature, digest)
+            except Exception as e:
+                print(f"[WARN] Analytics reload failed ({e}); keeping current snapshot.")
+                return False
+        print(f"[INFO] Analytics snapshot reloaded ({self.current.stats['total_problems']} problems).")
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def start(self):
+        if self._watcher is None and self.interval > 0:
+            self._watcher = threading.Thread(target=self._watch, name="analytics-reload", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+snapshots = SnapshotHolder()
+
+
+@app.on_event("startup")
+def startup_event():
+    try:
+        snapshots.get()
+    except Exception as e:
+        print(f"[ERROR] Failed to load analytics data: {e}")
+    snapshots.start()
+
 @app.get("/")
 def root():
     return {"message": "Analytics API active"}
@@ -34,22 +190,8 @@ def root():
 @app.get("/analytics/stats")
 def overall_stats():
     try:
-        df = load_data()
-        total = len(df)
-        avg_accept = round(df["acceptance"].mean(), 2) if "acceptance" in df else 0
-        easy = len(df[df["difficulty"] == "Easy"]) if "difficulty" in df else 0
-        medium = len(df[df["difficulty"] == "Medium"]) if "difficulty" in df else 0
-        hard = len(df[df["difficulty"] == "Hard"]) if "difficulty" in df else 0
-
-        return {
-            "total_problems": total,
-            "average_acceptance": avg_accept,
-            "difficulty_breakdown": {
-                "easy": easy,
-                "medium": medium,
-                "hard": hard
-            }
-        }
+        snapshot = snapshots.get()
+        return {**snapshot.stats, "difficulty_breakdown": dict(snapshot.stats["difficulty_breakdown"])}
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
@@ -57,29 +199,20 @@ def overall_stats():
 @app.get("/analytics/difficulty-distribution")
 def difficulty_distribution():
     try:
-        df = load_data()
-        if "difficulty" not in df.columns:
+        snapshot = snapshots.get()
+        if snapshot.difficulty_distribution is None:
             raise RuntimeError("Missing 'difficulty' column in dataset.")
-        counts = df["difficulty"].value_counts().to_dict()
-        return {"difficulty_distribution": counts}
+        return {"difficulty_distribution": dict(snapshot.difficulty_distribution)}
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 @app.get("/analytics/tag-frequency")
 def tag_frequency(top_k: int = 15):
     try:
-        df = load_data()
-        if "topic_tags" not in df.columns:
+        snapshot = snapshots.get()
+        if snapshot.tag_frequency is None:
             raise RuntimeError("Missing 'topic_tags' column in dataset.")
-
-        tags = df["topic_tags"].dropna().astype(str)
-        all_tags = []
-        for row in tags:
-            all_tags.extend([
-                t.strip() for t in row.strip("[]").replace("'", "").split(",") if t.strip()
-            ])
-        freq = pd.Series(all_tags).value_counts().head(top_k).to_dict()
-        return {"tag_frequency": freq}
+        return {"tag_frequency": dict(snapshot.tag_frequency[:top_k])}
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
@@ -87,34 +220,29 @@ def tag_frequency(top_k: int = 15):
 @app.get("/analytics/top-popular")
 def top_popular(k: int = 10):
     try:
-        df = load_data()
-        required_cols = ["frontend_id", "title", "likes", "acceptance", "difficulty"]
-        for col in required_cols:
-            if col not in df.columns:
-                raise RuntimeError(f"Missing '{col}' in dataset.")
-        df = df.sort_values("likes", ascending=False).head(k)
+        snapshot = snapshots.get()
+        if snapshot.popular is None:
+            raise RuntimeError("Missing popularity columns in dataset.")
+        popular = snapshot.popular[:k]
         return {
-            "count": len(df),
-            "popular_problems": df[required_cols].to_dict(orient="records")
+            "count": len(popular),
+            "popular_problems": popular
         }
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 @app.get("/analytics/acceptance-trends")
-def acceptance_trends(bins: int = 10):
+def acceptance_trends(bins: int = DEFAULT_TREND_BINS):
     try:
-        df = load_data()
-        if "acceptance" not in df.columns:
+        snapshot = snapshots.get()
+        if snapshot.acceptance is None:
             raise RuntimeError("Missing 'acceptance' column in dataset.")
-
-        df["acceptance"] = pd.to_numeric(df["acceptance"], errors="coerce").fillna(0)
-        hist, edges = pd.cut(df["acceptance"], bins=bins, retbins=True)
-        counts = hist.value_counts().sort_index().to_dict()
-        bins_list = [
-            f"{round(edges[i], 2)} - {round(edges[i + 1], 2)}"
-            for i in range(len(edges) - 1)
-        ]
-        result = {bins_list[i]: list(counts.values())[i] for i in range(len(bins_list))}
-        return {"acceptance_trends": result}
+        trends = snapshot.trends.get(bins)
+        if trends is None:
+            if not 1 <= bins <= MAX_TREND_BINS:
+                raise ValueError(f"bins must be between 1 and {MAX_TREND_BINS}")
+            # memoized per snapshot; concurrent first requests compute the same value
+            trends = snapshot.trends.setdefault(bins, _acceptance_trends(snapshot.acceptance, bins))
+        return {"acceptance_trends": trends}
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
\ No newline at end of file
+        return JSONResponse(content={"error": str(e)}, status_code=500)
@@ -1,21 +1,28 @@
 # src/api/auth.py
 import os
 import re
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 load_dotenv()
-import bcrypt
 import jwt
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from pydantic import BaseModel, EmailStr, constr, validator
 from typing import Optional, Dict
-from src.database.db_config import get_db_connection
+from src.database.db_config import PoolTimeout, db_connection, get_pool
+from src.api.lru_cache import LRUCache
+from src.api.passwords import HashingBusy, hash_password, needs_rehash, verify_password
 
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", 10000))
+# also bounds how long another worker keeps accepting a token after logout
+USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", 60))
+TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 4096))
 
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -49,15 +56,80 @@ class TokenResponse(BaseModel):
     token_type: str
     user_id: int
 
+
+# user_id -> {id, username, email, token_version}; filled at login and from the users row
+_user_cache = LRUCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+# raw token -> decoded payload, so repeat calls skip signature verification
+_verified_tokens = LRUCache(TOKEN_CACHE_SIZE)
+
+
+def _checkout():
+    try:
+        return get_pool().checkout()
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def get_db():
+    """Pooled connection for one request.
+
+    Handlers that need the database declare it; get_current_user does not,
+    so token checks never take a connection. FastAPI caches dependencies per
+    request, so anything else in the handler's dependency tree that asks for
+    get_db shares this one checkout. It goes back to the pool (rolled back
+    if uncommitted) once the handler finishes.
+    """
+    conn = _checkout()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _borrow_cursor(dictionary: bool = False):
+    """Short-lived (conn, cursor), so no connection is held while bcrypt runs."""
+    conn = _checkout()
+    try:
+        cursor = conn.cursor(dictionary=dictionary)
+        try:
+            yield conn, cursor
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
+
+
 def _hash_password(plaintext: str) -> str:
-    return bcrypt.hashpw(plaintext.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    try:
+        return hash_password(plaintext)
+    except HashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
 
 def _verify_password(plaintext: str, hashed: str) -> bool:
     try:
-        return bcrypt.checkpw(plaintext.encode("utf-8"), hashed.encode("utf-8"))
-    except Exception:
-        return False
+        return verify_password(plaintext, hashed)
+    except HashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def _rehash_if_needed(user_id: int, plaintext: str, stored_hash: str):
+    """Re-hash at the configured cost after a successful login; failures leave the old hash in place."""
+    if not needs_rehash(stored_hash):
+        return
+    try:
+        new_hash = _hash_password(plaintext)
+        with _borrow_cursor() as (conn, cursor):
+            cursor.execute(
+                "UPDATE users SET password_hash = %s WHERE id = %s AND password_hash = %s",
+                (new_hash, user_id, stored_hash),
+            )
+            conn.commit()
+    except Exception as e:
+        print(f"[WARN] Password rehash for user {user_id} skipped: {getattr(e, 'detail', e)}")
 
 
 def _create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -78,46 +150,41 @@ def signup(req: SignupRequest):
     Register a new user with hashed password.
     Enforces unique username and email.
     """
-    conn = get_db_connection()
-    if isinstance(conn, dict) and "error" in conn:
-        raise HTTPException(status_code=500, detail=conn["error"])
-
     try:
         username = req.username.strip()
         email = req.email.strip().lower()
         password = req.password
 
-        cursor = conn.cursor(dictionary=True)
-
         # check uniqueness
-        cursor.execute(
-            "SELECT id FROM users WHERE username = %s OR email = %s LIMIT 1",
-            (username, email),
-        )
-        existing = cursor.fetchone()
+        with _borrow_cursor(dictionary=True) as (conn, cursor):
+            cursor.execute(
+                "SELECT id FROM users WHERE username = %s OR email = %s LIMIT 1",
+                (username, email),
+            )
+            existing = cursor.fetchone()
         if existing:
             raise HTTPException(status_code=400, detail="Username or email already exists")
 
         hashed = _hash_password(password)
 
-        cursor.execute(
-            "INSERT INTO users (username, email, password_hash, created_at) VALUES (%s, %s, %s, CURRENT_TIMESTAMP)",
-            (username, email, hashed),
-        )
-        conn.commit()
+        with _borrow_cursor() as (conn, cursor):
+            try:
+                cursor.execute(
+                    "INSERT INTO users (username, email, password_hash, created_at) VALUES (%s, %s, %s, CURRENT_TIMESTAMP)",
+                    (username, email, hashed),
+                )
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                if getattr(e, "errno", None) == 1062:  # duplicate key: registered while we were hashing
+                    raise HTTPException(status_code=400, detail="Username or email already exists")
+                raise
 
         return {"message": "User registered successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        try:
-            cursor.close()
-            conn.close()
-        except Exception:
-            pass
 
 
 @router.post("/login", response_model=TokenResponse)
@@ -125,80 +192,117 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """
     Authenticate user (username or email) and issue JWT token.
     Accepts OAuth2PasswordRequestForm (fields: username, password).
+    Hashes stored at an outdated bcrypt cost are upgraded on success.
     """
-    conn = get_db_connection()
-    if isinstance(conn, dict) and "error" in conn:
-        raise HTTPException(status_code=500, detail=conn["error"])
-
     try:
         identifier = form_data.username.strip()  # could be username or email
         password = form_data.password
 
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT id, username, email, password_hash FROM users WHERE username = %s OR email = %s LIMIT 1",
-            (identifier, identifier),
-        )
-        user = cursor.fetchone()
+        with _borrow_cursor(dictionary=True) as (conn, cursor):
+            cursor.execute(
+                "SELECT id, username, email, password_hash, token_version FROM users "
+                "WHERE username = %s OR email = %s LIMIT 1",
+                (identifier, identifier),
+            )
+            user = cursor.fetchone()
         if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
 
         stored_hash = user.get("password_hash") or ""
         if not _verify_password(password, stored_hash):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
+        _rehash_if_needed(int(user["id"]), password, stored_hash)
 
+        record = {"id": int(user["id"]), "username": user["username"], "email": user["email"],
+                  "token_version": int(user.get("token_version") or 0)}
         token_payload = {
             "sub": user["username"],
-            "user_id": int(user["id"]),
+            "user_id": record["id"],
             "email": user["email"],
+            "tv": record["token_version"],
         }
         access_token = _create_access_token(token_payload, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+        _user_cache.put(record["id"], record)
 
         return {"access_token": access_token, "token_type": "bearer", "user_id": int(user["id"])}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
+
+def _decode_token(token: str) -> dict:
+    """Verified payload of `token`; signatures are checked once per token, expiry every call."""
+    payload = _verified_tokens.get(token)
+    if payload is None:
         try:
-            cursor.close()
-            conn.close()
-        except Exception:
-            pass
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail="Token expired")
+        except jwt.InvalidTokenError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        _verified_tokens.put(token, payload)
+    elif payload.get("exp") is not None and payload["exp"] <= time.time():
+        _verified_tokens.pop(token)
+        raise HTTPException(status_code=401, detail="Token expired")
+    return payload
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    """
-    Verify token and return user record dict {id, username, email}.
-    """
-    conn = get_db_connection()
-    if isinstance(conn, dict) and "error" in conn:
-        raise HTTPException(status_code=500, detail=conn["error"])
 
+def _load_user(user_id: int) -> Optional[dict]:
+    """The user's row, including the token version that logout bumps."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("user_id")
-        username = payload.get("sub")
-        if not user_id or not username:
-            raise HTTPException(status_code=401, detail="Invalid token payload")
-
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT id, username, email FROM users WHERE id = %s", (user_id,))
-        user = cursor.fetchone()
+        with db_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute("SELECT id, username, email, token_version FROM users WHERE id = %s", (user_id,))
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _authorized_user(payload: dict) -> dict:
+    """Cached user record for a decoded token; 401 if the user is gone or the token was revoked.
+
+    The token version lives in the users row, so a logout on any worker
+    (or before a restart) holds everywhere; other workers notice it once
+    their cached record expires (AUTH_USER_CACHE_TTL).
+    """
+    user_id = payload.get("user_id")
+    if not user_id or not payload.get("sub"):
+        raise HTTPException(status_code=401, detail="Invalid token payload")
+
+    user = _user_cache.get(user_id)
+    if user is None:
+        user = _load_user(user_id)
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
-        return user
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=str(e))
-    finally:
-        try:
-            cursor.close()
-            conn.close()
-        except Exception:
-            pass
+        user = {"id": int(user["id"]), "username": user["username"], "email": user["email"],
+                "token_version": int(user.get("token_version") or 0)}
+        _user_cache.put(user_id, user)
+    if int(payload.get("tv", 0)) < user["token_version"]:
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return user
+
+
+def revoke_tokens(user_id: int):
+    """Invalidate every token issued so far to `user_id` by bumping users.token_version."""
+    with _borrow_cursor() as (conn, cursor):
+        cursor.execute("UPDATE users SET token_version = token_version + 1 WHERE id = %s", (user_id,))
+        conn.commit()
+    _user_cache.pop(user_id)
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)):
+    """
+    Verify token and return user record dict {id, username, email}.
+    Served from the verified claims and the user cache; the users row is
+    read once per cache TTL to pick up revocations.
+    """
+    user = _authorized_user(_decode_token(token))
+    return {"id": user["id"], "username": user["username"], "email": user["email"]}
 
 
 @router.get("/me")
@@ -207,12 +311,20 @@ def read_current_user(current_user: dict = Depends(get_current_user)):
     return {"user": current_user}
 
 
-def verify_token(token: str = Depends(oauth2_scheme)):
-    """Lightweight JWT verifier (returns payload if valid)."""
+@router.post("/logout")
+def logout(current_user: dict = Depends(get_current_user)):
+    """Revoke every token issued to the current user (on every worker, and across restarts)."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+        revoke_tokens(current_user["id"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Logout failed: {e}")
+    return {"message": "Logged out"}
+
+
+def verify_token(token: str = Depends(oauth2_scheme)):
+    """Lightweight JWT verifier (returns payload if valid and not revoked)."""
+    payload = _decode_token(token)
+    _authorized_user(payload)
+    return dict(payload)
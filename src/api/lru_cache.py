@@ -0,0 +1,84 @@
+# src/api/lru_cache.py
+"""Bounded, thread-safe LRU map with an optional per-entry TTL.
+
+The in-process caches (auth users and tokens, progress rollups, formatted
+recommendation responses) are built on this; each feature subclasses or
+wraps it for its own keys and bookkeeping.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class LRUCache:
+    """At most `max_size` entries (0 disables caching); entries older than `ttl` seconds read as missing."""
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at or None)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def _live(self, key):
+        """(found, value) for `key`, dropping it if expired; caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        return True, value
+
+    def get(self, key):
+        with self._lock:
+            found, value = self._live(key)
+            if found:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value
+
+    def peek(self, key):
+        """Like get(), without touching recency or hit counts."""
+        with self._lock:
+            return self._live(key)[1]
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[0] if entry is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,8 +1,10 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.api import auth, user_progress, recommender
+from src.api.auth import get_current_user
 from src.api.recommender import init_recommender
 from src.modeling.lightGBM import load_resources
+from src.database.db_config import get_pool
 
 app = FastAPI(title="LeetCode Recommender Backend")
 
@@ -16,6 +18,12 @@ app.include_router(auth.router)
 app.include_router(user_progress.router)
 
 
+@app.get("/db/pool")
+def db_pool_stats(current_user: dict = Depends(get_current_user)):
+    """Connection pool occupancy, checkout counts and wait times (signed-in users only)."""
+    return get_pool().stats()
+
+
 from fastapi.middleware.cors import CORSMiddleware
 
 app.add_middleware(
@@ -0,0 +1,111 @@
+# src/api/passwords.py
+"""bcrypt hashing off the request threads.
+
+Hashes and checks run in a small process pool, so a login burst neither
+holds the GIL nor fills uvicorn's threadpool while recommendation requests
+wait. At most HASH_WORKERS + HASH_QUEUE jobs are admitted at a time; any
+more fail straight away with HashingBusy, which the API turns into a 503
+with Retry-After. AUTH_HASH_WORKERS=0 hashes on the calling thread (same
+admission limit), which is handy for local development.
+"""
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import bcrypt
+
+BCRYPT_ROUNDS = int(os.getenv("AUTH_BCRYPT_ROUNDS", 12))
+HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", min(2, os.cpu_count() or 1)))
+HASH_QUEUE = int(os.getenv("AUTH_HASH_QUEUE", 4 * max(1, HASH_WORKERS)))
+
+
+class HashingBusy(Exception):
+    """The hashing queue is full; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Password hashing is saturated; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _hash(plaintext: str, rounds: int) -> str:
+    return bcrypt.hashpw(plaintext.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check(plaintext: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(plaintext.encode("utf-8"), hashed.encode("utf-8"))
+    except Exception:
+        return False
+
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    """Cost factor of a "$2b$12$..." hash, or None if it is not a bcrypt hash."""
+    parts = (hashed or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed: str, rounds: int = BCRYPT_ROUNDS) -> bool:
+    return hash_rounds(hashed) != rounds
+
+
+class HashingPool:
+    """Process pool with an admission limit instead of an unbounded queue."""
+
+    def __init__(self, workers: int = HASH_WORKERS, queue: int = HASH_QUEUE):
+        self.workers = workers
+        self.capacity = max(1, workers) + queue
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._avg_seconds = 0.25  # running estimate of one job, for Retry-After
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _reset(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def retry_after(self) -> int:
+        """Seconds until a full queue has likely drained."""
+        return max(1, math.ceil(self._avg_seconds * self.capacity / max(1, self.workers)))
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy(self.retry_after())
+        start = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                return fn(*args)
+            return self._get_executor().submit(fn, *args).result()
+        except BrokenProcessPool:
+            self._reset()
+            raise HashingBusy(self.retry_after())
+        finally:
+            self._slots.release()
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.perf_counter() - start)
+
+    def shutdown(self):
+        self._reset()
+
+
+hashing_pool = HashingPool()
+
+
+def hash_password(plaintext: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    return hashing_pool.run(_hash, plaintext, rounds)
+
+
+def verify_password(plaintext: str, hashed: str) -> bool:
+    return hashing_pool.run(_check, plaintext, hashed)
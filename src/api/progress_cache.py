@@ -0,0 +1,195 @@
+# src/api/progress_cache.py
+"""Per-user solve rollups kept in memory and maintained on write.
+
+A UserProgress is built from one query the first time a user's progress is
+read, then mark/unmark update it in place after their transaction commits,
+so views never re-scan the solve history. Problem lists are kept sorted by
+(solved_at, problem_id), overall and per tag, and paginated newest-first
+with an opaque cursor built from that key, so a page costs O(log n + limit).
+
+Workers share nothing in memory, so every write also bumps
+users.progress_version in the same transaction. A cached copy records the
+version it reflects: reads compare it with the row (one primary-key lookup)
+and rebuild when another worker wrote in between, and a worker applies its
+own write in place only when the copy was current just before it.
+"""
+import base64
+import os
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from src.api.lru_cache import LRUCache
+
+PROGRESS_CACHE_SIZE = int(os.getenv("USER_PROGRESS_CACHE_SIZE", 1000))
+PROGRESS_CACHE_TTL = float(os.getenv("USER_PROGRESS_CACHE_TTL", 300))
+
+
+def split_tags(raw_tags: Optional[str]) -> List[str]:
+    return [t.strip().lower() for t in (raw_tags or "").split(",") if t.strip()]
+
+
+def utc_now() -> datetime:
+    """Naive UTC now at whole seconds: what the interactions.solved_at DATETIME column stores.
+
+    Writers stamp solved_at with this value in the SQL and in the cached copy
+    alike, so a patched copy orders and encodes cursors exactly like one
+    rebuilt from the table on any worker.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def _solved_key(solved_at) -> str:
+    if isinstance(solved_at, datetime):
+        return solved_at.strftime("%Y-%m-%d %H:%M:%S")
+    return str(solved_at or "")
+
+
+def encode_cursor(key: Tuple[str, int]) -> str:
+    return base64.urlsafe_b64encode(f"{key[0]}|{key[1]}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """(solved_at, problem_id) from a cursor; ValueError if it is malformed."""
+    try:
+        solved_at, problem_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return solved_at, int(problem_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class UserProgress:
+    """Solved problems of one user plus tag and difficulty counts."""
+
+    def __init__(self, rows=()):
+        self.problems: Dict[int, dict] = {}
+        self.tag_counts = Counter()
+        self.difficulty_counts = Counter()
+        self._keys: Dict[Optional[str], List[Tuple[str, int]]] = {None: []}  # None = all problems
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None  # users.progress_version this copy reflects
+        for row in rows:
+            self._add(row["problem_id"], row.get("problem_title"), row.get("tags"), row.get("difficulty"),
+                      row.get("solved_at"))
+
+    def _add(self, problem_id, title, raw_tags, difficulty, solved_at):
+        self._remove(problem_id)
+        problem = {
+            "problem_id": int(problem_id),
+            "title": title or "",
+            "difficulty": difficulty or "",
+            "tags": split_tags(raw_tags),
+            "solved_at": _solved_key(solved_at),
+        }
+        key = (problem["solved_at"], problem["problem_id"])
+        self.problems[problem["problem_id"]] = problem
+        self.difficulty_counts[problem["difficulty"]] += 1
+        for name in [None] + problem["tags"]:
+            insort(self._keys.setdefault(name, []), key)
+        self.tag_counts.update(problem["tags"])
+
+    def _remove(self, problem_id) -> bool:
+        problem = self.problems.pop(int(problem_id), None)
+        if problem is None:
+            return False
+        key = (problem["solved_at"], problem["problem_id"])
+        self.difficulty_counts[problem["difficulty"]] -= 1
+        if self.difficulty_counts[problem["difficulty"]] <= 0:
+            del self.difficulty_counts[problem["difficulty"]]
+        for name in [None] + problem["tags"]:
+            keys = self._keys[name]
+            del keys[bisect_left(keys, key)]
+            if name is not None and not keys:
+                del self._keys[name]
+        self.tag_counts.subtract(problem["tags"])
+        for tag in problem["tags"]:
+            if self.tag_counts[tag] <= 0:
+                del self.tag_counts[tag]
+        return True
+
+    def record_solve(self, problem_id, title, raw_tags, difficulty, solved_at=None):
+        with self._lock:
+            self._add(problem_id, title, raw_tags, difficulty, solved_at or utc_now())
+
+    def record_unsolve(self, problem_id):
+        with self._lock:
+            self._remove(problem_id)
+
+    def apply(self, version: int, solves=(), unsolves=(), solved_at: Optional[datetime] = None) -> bool:
+        """Apply a committed write that moved progress_version to `version`.
+
+        `solves` are (problem_id, title, raw_tags, difficulty) tuples, written
+        with `solved_at` (the value the SQL stored). Returns False, changing
+        nothing, if this copy missed an earlier write or a solve has no timestamp.
+        """
+        with self._lock:
+            if self.version is None or version != self.version + 1 or (solves and solved_at is None):
+                return False
+            for problem_id, title, raw_tags, difficulty in solves:
+                self._add(problem_id, title, raw_tags, difficulty, solved_at)
+            for problem_id in unsolves:
+                self._remove(problem_id)
+            self.version = version
+            return True
+
+    def solved_ids(self) -> List[int]:
+        """Solved problem ids, most recent first."""
+        with self._lock:
+            return [pid for _, pid in reversed(self._keys[None])]
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "total_solved": len(self.problems),
+                "difficulty_counts": dict(self.difficulty_counts),
+                "topics": [{"tag": tag, "count": count} for tag, count in self.tag_counts.most_common()],
+            }
+
+    def page(self, tag: Optional[str] = None, cursor: Optional[str] = None, limit: int = 50) -> dict:
+        """Newest-first problems solved before `cursor`, optionally within one tag."""
+        end_key = decode_cursor(cursor) if cursor else None
+        with self._lock:
+            keys = self._keys.get(tag.lower() if tag else None, [])
+            end = bisect_left(keys, end_key) if end_key else len(keys)
+            start = max(0, end - limit)
+            problems = [self.problems[pid] for _, pid in reversed(keys[start:end])]
+        tag_ids: Dict[str, List[int]] = {}
+        for problem in problems:
+            for t in problem["tags"]:
+                tag_ids.setdefault(t, []).append(problem["problem_id"])
+        last = problems[-1] if problems else None
+        return {
+            "problems": problems,
+            "tag_problem_ids": tag_ids,
+            "next_cursor": encode_cursor((last["solved_at"], last["problem_id"])) if start > 0 else None,
+        }
+
+
+class ProgressCache(LRUCache):
+    """LRU of UserProgress with a TTL; writes update cached entries and never build new ones."""
+
+    def __init__(self, max_users: int = PROGRESS_CACHE_SIZE, ttl: float = PROGRESS_CACHE_TTL):
+        super().__init__(max_users, ttl)
+
+    def current(self, user_id: int, version: int) -> Optional[UserProgress]:
+        """The cached copy if it reflects `version` (the users row's progress_version)."""
+        progress = self.get(user_id)
+        if progress is not None and progress.version != version:
+            self.pop(user_id)
+            return None
+        return progress
+
+    def invalidate(self, user_id: int):
+        self.pop(user_id)
+
+    def record_write(self, user_id: int, version: Optional[int], solves=(), unsolves=(),
+                     solved_at: Optional[datetime] = None):
+        """Apply a committed write to the cached copy, or drop the copy if it cannot be brought current."""
+        progress = self.peek(user_id)
+        if progress is not None and (version is None or not progress.apply(version, solves, unsolves, solved_at)):
+            self.pop(user_id)
+
+
+progress_cache = ProgressCache()
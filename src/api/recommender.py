@@ -1,14 +1,64 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import Optional
-import pandas as pd
-from src.modeling.lightGBM import load_resources, get_recommendations, get_learning_path
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import os
+from src.api.lru_cache import LRUCache
+from src.modeling.catalog import ProblemCatalog
+from src.modeling.lightGBM import (
+    artifact_version,
+    load_resources,
+    get_recommendation_rows,
+    get_learning_path,
+    get_batch_recommendations,
+    get_personalized_rows,
+)
+from src.modeling.rec_store import RecStore, load_rec_store
 
 router = APIRouter(prefix="", tags=["recommender"])
 
-df: Optional[pd.DataFrame] = None
-embeddings = tag_sims = diff_sims = popularity_score = model = None
+catalog: Optional[ProblemCatalog] = None
+embeddings = similarity = popularity_score = model = index = None
+rec_store: Optional[RecStore] = None
+
+LAMBDA_DIVERSITY = 0.6
+MAX_TOP_K = 100
+
+
+class ResponseCache(LRUCache):
+    """Bounded LRU of formatted responses with an optional TTL.
+
+    Keys carry the artifact version, and set_version() drops everything when
+    it changes, so a pipeline re-run never serves results from old artifacts.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: Optional[float] = None):
+        super().__init__(max_entries, ttl)
+        self.version = None
+
+    def key(self, problem_id: int, top_k: int, use_learning_path: bool, lambda_diversity: float = LAMBDA_DIVERSITY,
+            filters: tuple = ()):
+        # the learning path ignores top_k, so every top_k shares one entry
+        if use_learning_path:
+            return (problem_id, 0, "path", lambda_diversity, filters, self.version)
+        return (problem_id, top_k, "recs", lambda_diversity, filters, self.version)
+
+    def set_version(self, version: str):
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["max_entries"] = stats.pop("max_size")
+        return {"version": self.version, **stats}
+
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RECOMMENDER_CACHE_SIZE", 4096)),
+    ttl=float(os.getenv("RECOMMENDER_CACHE_TTL", 0)) or None,
+)
 
 
 def normalize_problem(p):
@@ -49,9 +99,21 @@ def normalize_problem(p):
     }
 
 def init_recommender():
-    global df, embeddings, tag_sims, diff_sims, popularity_score, model
-    df, embeddings, tag_sims, diff_sims, popularity_score, model = load_resources()
-    print(f"[READY] Recommender loaded with {len(df)} problems.")
+    global catalog, embeddings, similarity, popularity_score, model, index, rec_store
+    catalog, embeddings, similarity, popularity_score, model, index, fingerprint = load_resources(
+        index_type=os.getenv("RECOMMENDER_INDEX", "auto"),
+        quantization=os.getenv("RECOMMENDER_QUANTIZATION") or None,
+        similarity_cache_rows=int(os.getenv("RECOMMENDER_SIM_CACHE_ROWS", 0)),
+        model_backend=os.getenv("RECOMMENDER_MODEL_BACKEND", "lightgbm"),
+        return_fingerprint=True,
+    )
+    rec_store = None
+    if os.getenv("RECOMMENDER_REC_STORE", "1") != "0":
+        rec_store = load_rec_store(embeddings, model, lambda_diversity=LAMBDA_DIVERSITY, fingerprint=fingerprint)
+    if rec_store is not None:
+        print(f"[INFO] Serving default requests from the recommendation store ({len(rec_store)} problems).")
+    response_cache.set_version(artifact_version())
+    print(f"[READY] Recommender loaded with {len(catalog)} problems (artifact version {response_cache.version}).")
 
 @router.get("/")
 def root():
@@ -60,52 +122,219 @@ def root():
 
 class RecommendRequest(BaseModel):
     problem_id: int
-    top_k: Optional[int] = 10
+    top_k: Optional[int] = Field(10, ge=1, le=MAX_TOP_K)
     use_learning_path: Optional[bool] = False
+    # filters, applied inside retrieval so top_k is filled with eligible problems
+    difficulty: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+    match_all_tags: Optional[bool] = True
+    exclude_premium: Optional[bool] = False
+    exclude_problem_ids: Optional[List[int]] = None
+
+
+def _filter_key(body: RecommendRequest) -> tuple:
+    """Hashable, order-insensitive form of the request's filters; () when none are set."""
+    if not (body.difficulty or body.tags or body.exclude_premium or body.exclude_problem_ids):
+        return ()
+    return (
+        tuple(sorted(str(d).lower().strip() for d in body.difficulty or [])),
+        tuple(sorted(str(t).lower().strip() for t in body.tags or [])),
+        bool(body.match_all_tags) if body.tags else True,
+        bool(body.exclude_premium),
+        tuple(sorted(set(body.exclude_problem_ids or []))),
+    )
+
+
+def filter_mask(difficulty=None, tags=None, match_all_tags=True, exclude_premium=False, exclude_problem_ids=None):
+    """Catalog mask for the given filters (None when unfiltered); HTTP 400 for invalid values."""
+    if catalog is None:
+        raise RuntimeError("Model not loaded yet.")
+    exclude_rows = None
+    if exclude_problem_ids:
+        exclude_rows = [r for r in (catalog.row_of(pid) for pid in exclude_problem_ids) if r is not None]
+    try:
+        return catalog.filter_mask(
+            similarity.tags, difficulty=difficulty, tags=tags, match_all_tags=match_all_tags,
+            exclude_premium=exclude_premium, exclude_rows=exclude_rows,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _requested_problem(idx: int) -> dict:
+    return normalize_problem(catalog[idx].to_dict())
+
+
+def _stored_result(idx: int, top_k: int, use_learning_path: bool):
+    """Materialized result for a default-parameter request, or None to score live."""
+    if rec_store is None:
+        return None
+    if use_learning_path:
+        return rec_store.learning_path(idx, catalog, similarity.tags)
+    return rec_store.recommendations(idx, top_k)
+
+
+def _format_learning_path(learning_path: dict) -> dict:
+    for section in ["before", "similar", "after"]:
+        if section in learning_path:
+            learning_path[section] = [normalize_problem(p) for p in learning_path[section]]
+    return learning_path
+
+
+def _format_recommendations(rows, scores) -> list:
+    return [
+        normalize_problem({
+            "title": catalog.title[j],
+            "difficulty": catalog.difficulty[j],
+            "topic_tags": catalog.topic_tags[j],
+            "problem_URL": catalog.problem_URL[j],
+            "score": float(sc),
+        })
+        for j, sc in zip(rows, scores)
+    ]
+
+
+def _recommend_one(idx: int, body: RecommendRequest) -> dict:
+    """Response for one request on catalog row `idx`: cache, then store, then live scoring."""
+    top_k = body.top_k or 10
+    use_learning_path = bool(body.use_learning_path)
+    filters = _filter_key(body)
+
+    key = response_cache.key(body.problem_id, top_k, use_learning_path, filters=filters)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+
+    mask = filter_mask(body.difficulty, body.tags, body.match_all_tags, body.exclude_premium,
+                       body.exclude_problem_ids) if filters else None
+    problem_data = _requested_problem(idx)
+    stored = _stored_result(idx, top_k, use_learning_path) if mask is None else None
+
+    if use_learning_path:
+        learning_path = stored if stored is not None else get_learning_path(
+            idx, catalog, embeddings, popularity_score, model,
+            lambda_diversity=LAMBDA_DIVERSITY, index=index, similarity=similarity, mask=mask,
+        )
+        response = {"requested_problem": problem_data, "learning_path": _format_learning_path(learning_path)}
+    else:
+        rows, scores = stored if stored is not None else get_recommendation_rows(
+            idx, catalog, embeddings, similarity, popularity_score, model, k=top_k, use_mmr=True,
+            lambda_diversity=LAMBDA_DIVERSITY, index=index, mask=mask,
+        )
+        response = {"requested_problem": problem_data, "recommendations": _format_recommendations(rows, scores)}
+
+    response_cache.put(key, response)
+    return response
 
 
 @router.post("/recommend")
 def recommend_post(body: RecommendRequest):
     """Unified route for learning path or recommendations."""
-    if df is None:
+    if catalog is None:
         return JSONResponse(content={"error": "Model not loaded yet."}, status_code=500)
 
     try:
-        problem_id = body.problem_id
-        top_k = body.top_k or 10
-        use_learning_path = body.use_learning_path
+        idx = catalog.row_of(body.problem_id)
+        if idx is None:
+            raise HTTPException(status_code=400, detail=f"Problem ID {body.problem_id} not found.")
+        return _recommend_one(idx, body)
+
+    except HTTPException as he:
+        return JSONResponse(content={"error": he.detail}, status_code=he.status_code)
+    except Exception as e:
+        print("[Backend Exception]", e)
+        return JSONResponse(content={"error": str(e)}, status_code=500)
 
-        if problem_id not in df["frontend_id"].values:
-            raise HTTPException(status_code=400, detail=f"Problem ID {problem_id} not found.")
 
-        idx = int(df.index[df["frontend_id"] == problem_id][0])
-        problem_data = df.iloc[idx][["frontend_id", "title", "difficulty", "topic_tags"]].to_dict()
-        problem_data = normalize_problem(problem_data)
+def personalized_recommendations(solved_problem_ids: List[int], top_k: int = 10, strategy: str = "multi_seed",
+                                 mask=None) -> dict:
+    """Top-k unsolved problems for a user, seeded by their solved problem ids (most recent first).
 
-        if use_learning_path:
-            learning_path = get_learning_path(idx, df, embeddings, popularity_score, model)
-            for section in ["before", "similar", "after"]:
-                if section in learning_path:
-                    learning_path[section] = [normalize_problem(p) for p in learning_path[section]]
-            return {"requested_problem": problem_data, "learning_path": learning_path}
-
-        recs = get_recommendations(
-            idx, df, embeddings, tag_sims, diff_sims, popularity_score, model, k=top_k, use_mmr=True
+    `mask` (from filter_mask) further restricts which problems may be recommended.
+    """
+    if catalog is None:
+        raise RuntimeError("Model not loaded yet.")
+    solved_rows = [r for r in (catalog.row_of(pid) for pid in solved_problem_ids) if r is not None]
+    rows, scores, anchors = get_personalized_rows(
+        solved_rows, catalog, embeddings, similarity, popularity_score, model, k=top_k, strategy=strategy,
+        lambda_diversity=LAMBDA_DIVERSITY, index=index, mask=mask,
+    )
+    recommendations = _format_recommendations(rows, scores)
+    for rec, anchor in zip(recommendations, anchors):
+        rec["reason"] = f"because you solved {catalog.title[anchor]}"
+    return {"solved_count": len(solved_rows), "strategy": strategy, "recommendations": recommendations}
+
+
+MAX_BATCH_SIZE = 256
+
+
+class BatchRecommendRequest(BaseModel):
+    items: List[RecommendRequest]
+
+
+@router.post("/recommend/batch")
+def recommend_batch(body: BatchRecommendRequest):
+    """Many recommendation / learning-path queries served with one retrieval and one model call.
+
+    Results come back in request order; unknown problem ids get a per-item error
+    instead of failing the whole batch.
+    """
+    if catalog is None:
+        return JSONResponse(content={"error": "Model not loaded yet."}, status_code=500)
+    if len(body.items) > MAX_BATCH_SIZE:
+        return JSONResponse(content={"error": f"Batch too large (max {MAX_BATCH_SIZE} items)."}, status_code=400)
+
+    try:
+        results = [None] * len(body.items)
+        queries, positions, keys = [], [], []
+        stored = []
+        for pos, item in enumerate(body.items):
+            idx = catalog.row_of(item.problem_id)
+            if idx is None:
+                results[pos] = {"problem_id": item.problem_id, "error": f"Problem ID {item.problem_id} not found."}
+                continue
+            if _filter_key(item):
+                # filtered items get their own masked retrieval
+                try:
+                    results[pos] = _recommend_one(idx, item)
+                except HTTPException as he:
+                    results[pos] = {"problem_id": item.problem_id, "error": he.detail}
+                continue
+            top_k, use_learning_path = item.top_k or 10, bool(item.use_learning_path)
+            key = response_cache.key(item.problem_id, top_k, use_learning_path)
+            cached = response_cache.get(key)
+            if cached is not None:
+                results[pos] = cached
+                continue
+            out = _stored_result(idx, top_k, use_learning_path)
+            if out is not None:
+                stored.append((pos, key, (idx, top_k, use_learning_path), out))
+                continue
+            queries.append((idx, top_k, use_learning_path))
+            positions.append(pos)
+            keys.append(key)
+
+        outputs = get_batch_recommendations(
+            queries, catalog, embeddings, popularity_score, model, use_mmr=True,
+            lambda_diversity=LAMBDA_DIVERSITY, index=index, similarity=similarity, as_frames=False,
         )
-        rec_dicts = [
-            normalize_problem({
-                "title": row["title"],
-                "difficulty": row["difficulty"],
-                "topic_tags": row["topic_tags"],
-                "problem_URL": row["problem_URL"],
-                "score": row["score"],
-            })
-            for _, row in recs.iterrows()
-        ]
-        return {"requested_problem": problem_data, "recommendations": rec_dicts}
+        for pos, key, (idx, _, use_learning_path), out in stored + list(zip(positions, keys, queries, outputs)):
+            entry = {"requested_problem": _requested_problem(idx)}
+            if use_learning_path:
+                entry["learning_path"] = _format_learning_path(out)
+            else:
+                entry["recommendations"] = _format_recommendations(*out)
+            response_cache.put(key, entry)
+            results[pos] = entry
+
+        return {"count": len(results), "results": results}
 
-    except HTTPException as he:
-        return JSONResponse(content={"error": he.detail}, status_code=he.status_code)
     except Exception as e:
         print("[Backend Exception]", e)
         return JSONResponse(content={"error": str(e)}, status_code=500)
+
+
+@router.get("/recommend/cache")
+def recommend_cache_stats():
+    """Hit/miss counters and size of the response cache."""
+    return response_cache.stats()
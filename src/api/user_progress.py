@@ -1,15 +1,37 @@
 # src/api/user_progress.py
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
-from src.database.db_config import get_db_connection
-from src.api.auth import get_current_user
-from typing import Optional
+from src.api.auth import get_current_user, get_db
+from src.api import recommender
+from src.api.progress_cache import UserProgress, progress_cache, utc_now
+from typing import List, Optional
 
 router = APIRouter(prefix="/user", tags=["User Progress"])
 
 print("user_progress router loaded successfully")
 
 
+MAX_SOLVE_BATCH_SIZE = 2000
+
+# one round trip and no read-then-write race; relies on the unique (user_id, problem_id) key.
+# solved_at comes from utc_now() rather than CURRENT_TIMESTAMP so the cached copy can
+# be stamped with the exact value the row holds.
+UPSERT_SOLVED_SQL = """
+    INSERT INTO interactions (user_id, problem_id, problem_title, tags, difficulty, solved_at)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        solved_at = VALUES(solved_at),
+        problem_title = VALUES(problem_title),
+        tags = VALUES(tags),
+        difficulty = VALUES(difficulty)
+"""
+
+# run first in every write transaction: the users row lock orders concurrent writes
+# (and is taken before the interactions FK check); LAST_INSERT_ID(expr) hands the
+# new value back as cursor.lastrowid without another round trip
+BUMP_PROGRESS_VERSION_SQL = "UPDATE users SET progress_version = LAST_INSERT_ID(progress_version + 1) WHERE id = %s"
+
+
 class SolveRequest(BaseModel):
     problem_id: int
     problem_title: Optional[str] = None
@@ -17,8 +39,50 @@ class SolveRequest(BaseModel):
     difficulty: Optional[str] = None
 
 
+class SolveBatchRequest(BaseModel):
+    items: List[SolveRequest]
+
+
+def _load_progress(user_id: int, conn) -> UserProgress:
+    """Rollups for `user_id`: the cached copy if it is current, else rebuilt from one query."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        # read the version first, so a write landing in between only makes the copy look stale
+        cursor.execute("SELECT progress_version FROM users WHERE id = %s", (user_id,))
+        row = cursor.fetchone()
+        version = int(row["progress_version"]) if row else 0
+        progress = progress_cache.current(user_id, version)
+        if progress is None:
+            cursor.execute(
+                """
+                SELECT problem_id, problem_title, tags, difficulty, solved_at
+                FROM interactions
+                WHERE user_id = %s
+                ORDER BY solved_at, id
+                """,
+                (user_id,),
+            )
+            progress = UserProgress(cursor.fetchall())
+            progress.version = version
+            progress_cache.put(user_id, progress)
+    finally:
+        cursor.close()
+    return progress
+
+
+def _bump_progress_version(cursor, user_id: int) -> Optional[int]:
+    """Bump users.progress_version inside the caller's transaction; the new value, if the driver reports it."""
+    cursor.execute(BUMP_PROGRESS_VERSION_SQL, (user_id,))
+    return cursor.lastrowid or None
+
+
+def _solve_params(user_id: int, req: SolveRequest, solved_at) -> tuple:
+    return (user_id, req.problem_id, req.problem_title or "", req.tags or "", req.difficulty or "", solved_at)
+
+
 @router.post("/mark-solved")
-def mark_as_solved(req: SolveRequest, current_user: dict = Depends(get_current_user)):
+def mark_as_solved(req: SolveRequest, current_user: dict = Depends(get_current_user),
+                   conn=Depends(get_db)):
     """Record a solved problem for the currently logged-in user.
     If the same (user_id, problem_id) exists, update timestamp instead of inserting duplicate.
     """
@@ -29,49 +93,69 @@ def mark_as_solved(req: SolveRequest, current_user: dict = Depends(get_current_u
     if not user_id:
         raise HTTPException(status_code=401, detail="User not found in token payload")
 
-    conn = get_db_connection()
-    if isinstance(conn, dict) and "error" in conn:
-        raise HTTPException(status_code=500, detail=conn["error"])
-
     try:
         cursor = conn.cursor()
-        # Check if already exists
-        cursor.execute(
-            "SELECT id FROM interactions WHERE user_id = %s AND problem_id = %s",
-            (user_id, req.problem_id),
-        )
-        row = cursor.fetchone()
-        if row:
-            # update solved_at (idempotent)
-            cursor.execute(
-                "UPDATE interactions SET solved_at = CURRENT_TIMESTAMP, problem_title = %s, tags = %s, difficulty = %s WHERE id = %s",
-                (req.problem_title or "", req.tags or "", req.difficulty or "", row[0]),
-            )
-            conn.commit()
-            return {"message": f"Problem {req.problem_id} already marked; timestamp updated", "problem_id": req.problem_id}
-        else:
-            cursor.execute(
-                """
-                INSERT INTO interactions (user_id, problem_id, problem_title, tags, difficulty)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (user_id, req.problem_id, req.problem_title or "", req.tags or "", req.difficulty or ""),
-            )
-            conn.commit()
+        version = _bump_progress_version(cursor, user_id)
+        solved_at = utc_now()
+        cursor.execute(UPSERT_SOLVED_SQL, _solve_params(user_id, req, solved_at))
+        conn.commit()
+        progress_cache.record_write(user_id, version, solved_at=solved_at,
+                                    solves=[(req.problem_id, req.problem_title, req.tags, req.difficulty)])
+        # MySQL reports 1 affected row for an insert, 2 for an update
+        if cursor.rowcount == 1:
             return {"message": f"Problem {req.problem_id} marked as solved", "problem_id": req.problem_id}
+        return {"message": f"Problem {req.problem_id} already marked; timestamp updated", "problem_id": req.problem_id}
+    except Exception as e:
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+@router.post("/mark-solved/batch")
+def mark_solved_batch(body: SolveBatchRequest, current_user: dict = Depends(get_current_user),
+                      conn=Depends(get_db)):
+    """Record many solved problems in one transaction (e.g. importing a solve history).
+    Repeated problem ids keep the last entry.
+    """
+    user_id = current_user.get("id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="User not found in token payload")
+    if len(body.items) > MAX_SOLVE_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch too large (max {MAX_SOLVE_BATCH_SIZE} items).")
+
+    latest = {req.problem_id: req for req in body.items}
+    if not latest:
+        return {"message": "Nothing to mark", "count": 0}
+
+    try:
+        cursor = conn.cursor()
+        version = _bump_progress_version(cursor, user_id)
+        solved_at = utc_now()
+        # executemany folds the rows into a single multi-row INSERT ... ON DUPLICATE KEY UPDATE
+        cursor.executemany(UPSERT_SOLVED_SQL, [_solve_params(user_id, req, solved_at) for req in latest.values()])
+        conn.commit()
+        progress_cache.record_write(user_id, version, solved_at=solved_at, solves=[
+            (req.problem_id, req.problem_title, req.tags, req.difficulty) for req in latest.values()
+        ])
+        return {"message": f"{len(latest)} problems marked as solved", "count": len(latest),
+                "problem_ids": list(latest)}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         try:
             cursor.close()
-            conn.close()
         except Exception:
             pass
 
 
 @router.post("/unmark-solved")
-def unmark_solved(req: SolveRequest, current_user: dict = Depends(get_current_user)):
+def unmark_solved(req: SolveRequest, current_user: dict = Depends(get_current_user),
+                  conn=Depends(get_db)):
     """Remove a solved record (undo)."""
     if not current_user:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
@@ -80,21 +164,20 @@ def unmark_solved(req: SolveRequest, current_user: dict = Depends(get_current_us
     if not user_id:
         raise HTTPException(status_code=401, detail="User not found in token payload")
 
-    conn = get_db_connection()
-    if isinstance(conn, dict) and "error" in conn:
-        raise HTTPException(status_code=500, detail=conn["error"])
-
     try:
         cursor = conn.cursor()
+        version = _bump_progress_version(cursor, user_id)
         cursor.execute(
             "DELETE FROM interactions WHERE user_id = %s AND problem_id = %s",
             (user_id, req.problem_id),
         )
         affected = cursor.rowcount
-        conn.commit()
         if affected:
+            conn.commit()
+            progress_cache.record_write(user_id, version, unsolves=[req.problem_id])
             return {"message": f"Problem {req.problem_id} unmarked for user {user_id}"}
         else:
+            conn.rollback()  # nothing changed; leave the version alone
             return {"message": "No record found to delete", "problem_id": req.problem_id}
     except Exception as e:
         conn.rollback()
@@ -102,22 +185,18 @@ def unmark_solved(req: SolveRequest, current_user: dict = Depends(get_current_us
     finally:
         try:
             cursor.close()
-            conn.close()
         except Exception:
             pass
 
 
 @router.get("/is-solved/{problem_id}")
-def is_solved(problem_id: int, current_user: dict = Depends(get_current_user)):
+def is_solved(problem_id: int, current_user: dict = Depends(get_current_user),
+              conn=Depends(get_db)):
     """Quick check whether the logged-in user has solved the given problem."""
     if not current_user:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
 
     user_id = current_user.get("id")
-    conn = get_db_connection()
-    if isinstance(conn, dict) and "error" in conn:
-        raise HTTPException(status_code=500, detail=conn["error"])
-
     try:
         cursor = conn.cursor()
         cursor.execute(
@@ -134,59 +213,61 @@ def is_solved(problem_id: int, current_user: dict = Depends(get_current_user)):
     finally:
         try:
             cursor.close()
-            conn.close()
         except Exception:
             pass
 
 
 @router.get("/progress")
-def get_user_progress(current_user: dict = Depends(get_current_user)):
-    """Fetch all solved problems grouped by tags for the logged-in user."""
+def get_user_progress(cursor: Optional[str] = None, limit: int = Query(50, ge=1, le=500),
+                      tag: Optional[str] = None,
+                      current_user: dict = Depends(get_current_user),
+                      conn=Depends(get_db)):
+    """Solve counts per tag and difficulty, plus one page of solved problems (newest first).
+
+    Each problem appears once; `tag_problem_ids` maps tags to the ids on this
+    page. Pass `next_cursor` back as `cursor` for the next page, and `tag`
+    to page through a single topic.
+    """
     user_id = current_user.get("id")
 
-    conn = get_db_connection()
-    if isinstance(conn, dict) and "error" in conn:
-        raise HTTPException(status_code=500, detail=conn["error"])
+    try:
+        progress = _load_progress(user_id, conn)
+        page = progress.page(tag=tag, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"user_id": user_id, **progress.summary(), **page}
+
+
+@router.get("/recommendations")
+def get_user_recommendations(top_k: int = Query(10, ge=1, le=recommender.MAX_TOP_K),
+                             strategy: str = "multi_seed",
+                             difficulty: Optional[List[str]] = Query(None),
+                             tags: Optional[List[str]] = Query(None),
+                             match_all_tags: bool = True,
+                             exclude_premium: bool = False,
+                             current_user: dict = Depends(get_current_user),
+                             conn=Depends(get_db)):
+    """Personalized "what next" list: unsolved problems closest to the user's solved history.
+
+    difficulty / tags / exclude_premium filter the candidates inside retrieval
+    (e.g. ?difficulty=Medium&tags=graph&exclude_premium=true).
+    """
+    user_id = current_user.get("id")
+    if strategy not in ("multi_seed", "centroid"):
+        raise HTTPException(status_code=400, detail="strategy must be 'multi_seed' or 'centroid'")
 
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(
-            """
-            SELECT tags, problem_title, difficulty
-            FROM interactions
-            WHERE user_id = %s
-            ORDER BY solved_at DESC
-            """,
-            (user_id,),
-        )
-        rows = cursor.fetchall()
-
-        if not rows:
-            return {"user_id": user_id, "topics": []}
-        tag_groups = {}
-        for row in rows:
-            raw_tags = row.get("tags") or ""
-            tag_list = [t.strip().lower() for t in raw_tags.split(",") if t.strip()]
-            for tag in tag_list:
-                tag_groups.setdefault(tag, []).append(
-                    {
-                        "title": row.get("problem_title"),
-                        "difficulty": row.get("difficulty"),
-                    }
-                )
-
-        result = [
-            {"tag": tag, "count": len(problems), "problems": problems}
-            for tag, problems in tag_groups.items()
-        ]
-
-        return {"user_id": user_id, "topics": result}
+        solved = _load_progress(user_id, conn).solved_ids()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        try:
-            cursor.close()
-            conn.close()
-        except Exception:
-            pass
 
+    try:
+        mask = recommender.filter_mask(difficulty, tags, match_all_tags, exclude_premium)
+        result = recommender.personalized_recommendations(solved, top_k=top_k, strategy=strategy, mask=mask)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"user_id": user_id, **result}
@@ -1,24 +1,260 @@
 import mysql.connector
 import json
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import quote_plus
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+CONFIG_PATH = os.path.join(BASE_DIR, "config.json")
+
+# pool settings, overridable from the environment
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))                  # connections kept open while idle
+POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", 10))  # extra connections opened under load
+POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", 1800))        # seconds before a connection is replaced
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))          # seconds to wait for a free connection
+POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", 30))    # ping connections idle longer than this
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool timeout."""
+
+
+@lru_cache(maxsize=1)
+def load_config() -> dict:
+    """config.json, read once per process."""
+    if not os.path.exists(CONFIG_PATH):
+        raise FileNotFoundError(f"config.json not found at: {CONFIG_PATH}")
+    with open(CONFIG_PATH) as f:
+        return json.load(f)
+
+
+def connect():
+    """A new (unpooled) MySQL connection."""
+    config = load_config()
+    return mysql.connector.connect(
+        host=config.get("MYSQL_HOST", "localhost"),
+        user=config["MYSQL_USER"],
+        password=config["MYSQL_PASSWORD"],
+        database=config["MYSQL_DB"]
+    )
+
+
+def database_url() -> str:
+    """SQLAlchemy URL for the same database (used by Alembic)."""
+    config = load_config()
+    return "mysql+mysqlconnector://{}:{}@{}/{}".format(
+        quote_plus(config["MYSQL_USER"]),
+        quote_plus(config["MYSQL_PASSWORD"]),
+        config.get("MYSQL_HOST", "localhost"),
+        config["MYSQL_DB"],
+    )
+
+
+class PooledConnection:
+    """Proxy for a borrowed connection; close() hands it back to the pool."""
+
+    def __init__(self, pool, raw, created: float):
+        self._pool = pool
+        self._raw = raw
+        self._created = created
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise RuntimeError("connection was returned to the pool")
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool._release(raw, self._created)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """Thread-safe LIFO pool of MySQL connections.
+
+    Up to `size` connections stay open while idle; under load up to
+    `max_overflow` more are opened and closed again on return. Connections
+    older than `recycle` seconds are replaced, and ones idle for more than
+    `ping_after` seconds are pinged on checkout. Returned connections are
+    rolled back when a transaction is still open, so the next borrower never
+    sees one.
+    """
+
+    def __init__(self, creator=connect, size: int = POOL_SIZE, max_overflow: int = POOL_MAX_OVERFLOW,
+                 recycle: float = POOL_RECYCLE, timeout: float = POOL_TIMEOUT, ping_after: float = POOL_PING_AFTER):
+        self.creator = creator
+        self.size = size
+        self.max_overflow = max_overflow
+        self.recycle = recycle
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self._idle = deque()  # (raw, created, returned_at)
+        self._open = 0
+        self._available = threading.Condition(threading.Lock())
+        self._stats = {"checkouts": 0, "waits": 0, "wait_time_ms": 0.0, "max_wait_ms": 0.0, "timeouts": 0,
+                       "created": 0, "recycled": 0, "failed_pings": 0}
+
+    def checkout(self) -> PooledConnection:
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        with self._available:
+            waited = False
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    entry = None
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"no database connection free after {self.timeout:.1f}s")
+                waited = True
+                self._available.wait(remaining)
+            wait_ms = (time.perf_counter() - start) * 1000
+            self._stats["checkouts"] += 1
+            self._stats["waits"] += waited
+            self._stats["wait_time_ms"] += wait_ms
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+
+        try:
+            raw, created = self._usable(entry)
+        except Exception:
+            with self._available:
+                self._open -= 1
+                self._available.notify()
+            raise
+        return PooledConnection(self, raw, created)
+
+    def _usable(self, entry):
+        """(connection, created) for a popped idle entry, replacing it if stale or dead; new if entry is None."""
+        if entry is not None:
+            raw, created, returned_at = entry
+            now = time.time()
+            if now - created > self.recycle:
+                self._count("recycled")
+                self._close_quietly(raw)
+            elif now - returned_at > self.ping_after and not self._ping(raw):
+                self._count("failed_pings")
+                self._close_quietly(raw)
+            else:
+                return raw, created
+        raw = self.creator()
+        self._count("created")
+        return raw, time.time()
+
+    def _release(self, raw, created: float):
+        healthy = True
+        # skip the round trip when the borrower left no transaction open
+        if getattr(raw, "in_transaction", True):
+            try:
+                raw.rollback()
+            except Exception:
+                healthy = False
+        with self._available:
+            keep = healthy and len(self._idle) < self.size
+            if keep:
+                self._idle.append((raw, created, time.time()))
+            else:
+                self._open -= 1
+            self._available.notify()
+        if not keep:
+            self._close_quietly(raw)
+
+    def _count(self, key: str):
+        with self._available:
+            self._stats[key] += 1
+
+    @staticmethod
+    def _ping(raw) -> bool:
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def dispose(self):
+        """Close every idle connection (borrowed ones are closed when returned)."""
+        with self._available:
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+        for raw, _, _ in idle:
+            self._close_quietly(raw)
+
+    def stats(self) -> dict:
+        with self._available:
+            stats = dict(self._stats)
+            idle, open_ = len(self._idle), self._open
+        checkouts = stats["checkouts"]
+        return {
+            "size": self.size,
+            "max_overflow": self.max_overflow,
+            "open": open_,
+            "idle": idle,
+            "in_use": open_ - idle,
+            **stats,
+            "avg_wait_ms": stats["wait_time_ms"] / checkouts if checkouts else 0.0,
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+@contextmanager
+def db_connection():
+    """Borrow a pooled connection for the duration of a with block."""
+    conn = get_pool().checkout()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def db_cursor(dictionary: bool = False, commit: bool = False):
+    """Pooled connection plus cursor; commits on success when `commit` is set."""
+    with db_connection() as conn:
+        cursor = conn.cursor(dictionary=dictionary)
+        try:
+            yield cursor
+            if commit:
+                conn.commit()
+        finally:
+            cursor.close()
+
 
 def get_db_connection():
+    """Borrowed pooled connection (close() returns it), or {"error": ...} if none could be obtained."""
     try:
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
-        config_path = os.path.join(base_dir, "config.json")
-
-        if not os.path.exists(config_path):
-            raise FileNotFoundError(f"config.json not found at: {config_path}")
-
-        with open(config_path) as f:
-            config = json.load(f)
-
-        conn = mysql.connector.connect(
-            host="localhost",
-            user=config["MYSQL_USER"],
-            password=config["MYSQL_PASSWORD"],
-            database=config["MYSQL_DB"]
-        )
-        return conn
+        return get_pool().checkout()
     except Exception as e:
         return {"error": str(e)}
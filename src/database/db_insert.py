@@ -1,80 +1,121 @@
+import hashlib
+import time
+
 import pandas as pd
 import random
-from src.database.db_config import get_connection
-def insert_problems_from_csv(csv_path: str):
-    df = pd.read_csv(csv_path)
-    conn = get_connection()
-    cursor = conn.cursor()
+from src.database.db_config import db_connection
+from src.modeling.dataset_store import iter_dataset
+
+PROBLEM_COLUMNS = ["frontend_id", "title", "topic_tags", "difficulty", "acceptance_rate", "likes", "dislikes"]
+
+UPSERT_PROBLEM_SQL = """
+    INSERT INTO problems
+    (problem_id, title, tags, difficulty, acceptance, likes, dislikes, content_hash)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        title = VALUES(title),
+        tags = VALUES(tags),
+        difficulty = VALUES(difficulty),
+        acceptance = VALUES(acceptance),
+        likes = VALUES(likes),
+        dislikes = VALUES(dislikes),
+        content_hash = VALUES(content_hash)
+"""
+
+
+def _problem_rows(chunk: pd.DataFrame):
+    """(problem_id, title, tags, difficulty, acceptance, likes, dislikes, content_hash) per CSV row."""
+    chunk = chunk.dropna(subset=["frontend_id"])
+    columns = zip(
+        chunk["frontend_id"].astype(int),
+        chunk["title"].astype(str),
+        chunk["topic_tags"].astype(str),
+        chunk["difficulty"].astype(str),
+        chunk["acceptance_rate"].astype(float).fillna(0.0),
+        chunk["likes"].fillna(0).astype(int),
+        chunk["dislikes"].fillna(0).astype(int),
+    )
+    for pid, title, tags, difficulty, acceptance, likes, dislikes in columns:
+        values = (int(pid), title, tags, difficulty, float(acceptance), int(likes), int(dislikes))
+        digest = hashlib.sha1("\x1f".join(map(repr, values)).encode("utf-8")).hexdigest()[:16]
+        yield values + (digest,)
+
 
-    for _, row in df.iterrows():
+def insert_problems_from_csv(csv_path: str, chunk_size: int = 1000, force: bool = False) -> dict:
+    """Stream the CSV into `problems`, `chunk_size` rows per multi-row upsert and commit.
+
+    Reads the columnar bundle next to the CSV instead when it is up to date.
+    Rows whose content hash matches the stored one are skipped, so a refresh
+    only writes problems that changed (force=True rewrites everything).
+    """
+    start = time.perf_counter()
+    stats = {"rows": 0, "written": 0, "unchanged": 0}
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
         try:
-            cursor.execute("""
-                INSERT INTO problems 
-                (problem_id, title, tags, difficulty, acceptance, likes, dislikes)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    title = VALUES(title),
-                    tags = VALUES(tags),
-                    difficulty = VALUES(difficulty),
-                    acceptance = VALUES(acceptance),
-                    likes = VALUES(likes),
-                    dislikes = VALUES(dislikes);
-            """, (
-                int(row['frontend_id']),
-                str(row['title']),
-                str(row['topic_tags']),
-                str(row['difficulty']),
-                float(row['acceptance_rate']),
-                int(row['likes']),
-                int(row['dislikes'])
-            ))
-        except Exception as e:
-            print(f"Error inserting problem {row.get('frontend_id', 'unknown')}: {e}")
-
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print(f"Inserted/updated {len(df)} problems successfully.")
+            known = {}
+            if not force:
+                cursor.execute("SELECT problem_id, content_hash FROM problems")
+                known = dict(cursor.fetchall())
 
+            for chunk in iter_dataset(csv_path, PROBLEM_COLUMNS, chunk_size):
+                rows = list(_problem_rows(chunk))
+                changed = [row for row in rows if known.get(row[0]) != row[-1]]
+                stats["rows"] += len(rows)
+                stats["unchanged"] += len(rows) - len(changed)
+                if not changed:
+                    continue
+                try:
+                    # mysql.connector folds executemany INSERTs into one multi-row statement
+                    cursor.executemany(UPSERT_PROBLEM_SQL, changed)
+                    conn.commit()
+                    stats["written"] += len(changed)
+                except Exception as e:
+                    conn.rollback()
+                    print(f"Error upserting problems {changed[0][0]}..{changed[-1][0]}: {e}")
+        finally:
+            cursor.close()
 
-def insert_dummy_users(n: int = 50):
-    conn = get_connection()
-    cursor = conn.cursor()
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed > 0 else 0.0
+    print(f"Inserted/updated {stats['written']} problems ({stats['unchanged']} unchanged) "
+          f"from {stats['rows']} rows in {elapsed:.2f}s ({stats['rows_per_sec']:.0f} rows/sec).")
+    return stats
 
-    for i in range(n):
-        cursor.execute(
-            "INSERT INTO users (username, experience_level) VALUES (%s, %s)",
-            (f"user_{i+1}", random.choice(['beginner', 'intermediate', 'advanced']))
-        )
 
-    conn.commit()
-    cursor.close()
-    conn.close()
+def insert_dummy_users(n: int = 50):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT IGNORE INTO users (username, experience_level) VALUES (%s, %s)",
+            [(f"user_{i+1}", random.choice(['beginner', 'intermediate', 'advanced'])) for i in range(n)],
+        )
+        conn.commit()
+        cursor.close()
     print(f"Inserted {n} dummy users.")
 
-def insert_dummy_interactions(sample_size: int = 40):
-    conn = get_connection()
-    cursor = conn.cursor()
+def insert_dummy_interactions(sample_size: int = 40, chunk_size: int = 1000):
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("SELECT user_id FROM users")
-    user_ids = [u[0] for u in cursor.fetchall()]
+        cursor.execute("SELECT id FROM users")
+        user_ids = [u[0] for u in cursor.fetchall()]
 
-    cursor.execute("SELECT problem_id FROM problems")
-    problem_ids = [p[0] for p in cursor.fetchall()]
+        cursor.execute("SELECT problem_id FROM problems")
+        problem_ids = [p[0] for p in cursor.fetchall()]
 
-    for uid in user_ids:
-        for pid in random.sample(problem_ids, min(sample_size, len(problem_ids))):
-            cursor.execute("""
-                INSERT INTO interactions (user_id, problem_id, status, rating)
+        rows = [
+            (uid, pid, random.choice(['attempted', 'solved', 'skipped']), random.randint(1, 5))
+            for uid in user_ids
+            for pid in random.sample(problem_ids, min(sample_size, len(problem_ids)))
+        ]
+        for start in range(0, len(rows), chunk_size):
+            cursor.executemany("""
+                INSERT IGNORE INTO interactions (user_id, problem_id, status, rating)
                 VALUES (%s, %s, %s, %s)
-            """, (
-                uid,
-                pid,
-                random.choice(['attempted', 'solved', 'skipped']),
-                random.randint(1, 5)
-            ))
-
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print(f"Created {len(user_ids) * sample_size} dummy interactions.")
+            """, rows[start:start + chunk_size])
+            conn.commit()
+        cursor.close()
+    print(f"Created {len(rows)} dummy interactions.")
@@ -0,0 +1,126 @@
+# src/database/explain_check.py
+"""EXPLAIN the API's hot queries against a local database and flag full scans.
+
+    python -m src.database.explain_check            # exits 1 if any query regresses
+
+A query fails when MySQL plans a full table scan (type ALL) on a table
+larger than `min_rows`, uses a filesort where an index should give the
+order, or when no candidate index covers the columns it is meant to use.
+Indexes are matched by their leading columns, not their names, so schemas
+that already had an equivalent index under another name pass too. Small
+tables are only held to the last check, because the optimizer rightly
+scans a few pages instead of using an index.
+"""
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.database.db_config import db_connection
+
+
+class HotQuery(NamedTuple):
+    name: str
+    sql: str
+    params: Tuple
+    keys: Tuple[Tuple[str, ...], ...]  # column sets some candidate index must lead with (one per lookup)
+    ordered: bool = False        # ORDER BY must come from the index (no filesort)
+
+
+HOT_QUERIES = [
+    HotQuery(
+        "mark-solved / is-solved lookup",
+        "SELECT id, solved_at FROM interactions WHERE user_id = %s AND problem_id = %s",
+        (1, 1), (("user_id", "problem_id"),),
+    ),
+    HotQuery(
+        "unmark-solved delete",
+        "DELETE FROM interactions WHERE user_id = %s AND problem_id = %s",
+        (1, 1), (("user_id", "problem_id"),),
+    ),
+    HotQuery(
+        "progress history",
+        "SELECT problem_id, problem_title, tags, difficulty, solved_at FROM interactions "
+        "WHERE user_id = %s ORDER BY solved_at, id",
+        (1,), (("user_id", "solved_at"),), ordered=True,
+    ),
+    HotQuery(
+        "login lookup",
+        "SELECT id, username, email, password_hash FROM users WHERE username = %s OR email = %s LIMIT 1",
+        ("someone", "someone"), (("username",), ("email",)),
+    ),
+]
+
+
+def _table_rows(cursor, table: str) -> int:
+    cursor.execute(
+        "SELECT COALESCE(TABLE_ROWS, 0) AS n FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,),
+    )
+    row = cursor.fetchone()
+    return int(row["n"]) if row else 0
+
+
+def _index_columns(cursor, table: str) -> Dict[str, List[str]]:
+    """index name -> its columns in key order."""
+    cursor.execute(
+        "SELECT INDEX_NAME AS name, COLUMN_NAME AS col FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+        (table,),
+    )
+    columns: Dict[str, List[str]] = {}
+    for row in cursor.fetchall():
+        columns.setdefault(row["name"], []).append(row["col"].lower())
+    return columns
+
+
+def _covers(index_columns: List[str], key: Tuple[str, ...]) -> bool:
+    """True if the index leads with exactly the columns of `key` (in any order)."""
+    return set(index_columns[:len(key)]) == set(key)
+
+
+def check_query(cursor, query: HotQuery, min_rows: int = 1000) -> List[str]:
+    """Problems found in the query's plan (empty when it is fine)."""
+    cursor.execute("EXPLAIN " + query.sql, query.params)
+    plan = cursor.fetchall()
+    problems = []
+    for step in plan:
+        table = step.get("table")
+        if not table or table.startswith("<"):
+            continue
+        possible = set((step.get("possible_keys") or "").split(",")) | set((step.get("key") or "").split(","))
+        possible.discard("")
+        extra = step.get("Extra") or ""
+        large = _table_rows(cursor, table) > min_rows
+        index_columns = _index_columns(cursor, table)
+        for key in query.keys:
+            if not any(_covers(index_columns.get(name, []), key) for name in possible):
+                problems.append(f"{table}: no candidate index on ({', '.join(key)}) "
+                                f"(possible_keys={step.get('possible_keys')})")
+        if large and step.get("type") == "ALL":
+            problems.append(f"{table}: full table scan")
+        if large and query.ordered and "Using filesort" in extra:
+            problems.append(f"{table}: filesort instead of index order")
+    return problems
+
+
+def check_hot_queries(min_rows: int = 1000, queries: Optional[List[HotQuery]] = None) -> dict:
+    """{query name: [problems]} for every hot query."""
+    results = {}
+    with db_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            for query in queries or HOT_QUERIES:
+                results[query.name] = check_query(cursor, query, min_rows)
+        finally:
+            cursor.close()
+    return results
+
+
+if __name__ == "__main__":
+    min_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    results = check_hot_queries(min_rows)
+    for name, problems in results.items():
+        print(f"[{'FAIL' if problems else 'OK'}] {name}")
+        for problem in problems:
+            print(f"       {problem}")
+    sys.exit(1 if any(results.values()) else 0)
@@ -0,0 +1,72 @@
+# src/database/models.py
+"""SQLAlchemy table metadata for the MySQL schema.
+
+The API keeps issuing plain SQL through mysql.connector; these definitions
+exist so Alembic can autogenerate and check migrations. Indexes mirror the
+hot queries:
+
+    interactions WHERE user_id = ? AND problem_id = ?   uq_interactions_user_problem
+    interactions WHERE user_id = ? ORDER BY solved_at   ix_interactions_user_solved_at
+    users WHERE username = ? OR email = ?               uq_users_username + uq_users_email (index merge)
+"""
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+    func,
+)
+
+metadata = MetaData()
+
+users = Table(
+    "users",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("username", String(30), nullable=False),
+    Column("email", String(255), nullable=True),
+    Column("password_hash", String(255), nullable=True),
+    Column("experience_level", String(20), nullable=True),
+    Column("created_at", DateTime, nullable=False, server_default=func.current_timestamp()),
+    Column("token_version", Integer, nullable=False, server_default="0"),  # bumped by /auth/logout
+    Column("progress_version", BigInteger, nullable=False, server_default="0"),  # bumped by every solve write
+    UniqueConstraint("username", name="uq_users_username"),
+    UniqueConstraint("email", name="uq_users_email"),
+)
+
+problems = Table(
+    "problems",
+    metadata,
+    Column("problem_id", Integer, primary_key=True, autoincrement=False),
+    Column("title", String(255), nullable=False),
+    Column("tags", Text, nullable=True),
+    Column("difficulty", String(16), nullable=True),
+    Column("acceptance", Float, nullable=True),
+    Column("likes", Integer, nullable=True),
+    Column("dislikes", Integer, nullable=True),
+    Column("content_hash", String(16), nullable=True),  # written by db_insert to skip unchanged rows
+)
+
+interactions = Table(
+    "interactions",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("problem_id", Integer, nullable=False),
+    Column("problem_title", String(255), nullable=True),
+    Column("tags", Text, nullable=True),
+    Column("difficulty", String(16), nullable=True),
+    Column("status", String(16), nullable=True),
+    Column("rating", Integer, nullable=True),
+    Column("solved_at", DateTime, nullable=False, server_default=func.current_timestamp()),
+    UniqueConstraint("user_id", "problem_id", name="uq_interactions_user_problem"),
+    Index("ix_interactions_user_solved_at", "user_id", "solved_at", "id"),
+)
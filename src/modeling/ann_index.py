@@ -0,0 +1,564 @@
+# src/modeling/ann_index.py
+import time
+import json
+import threading
+import hashlib
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def embeddings_fingerprint(embeddings: np.ndarray) -> str:
+    """Short content hash used to detect stale on-disk artifacts."""
+    arr = np.ascontiguousarray(embeddings, dtype=np.float32)
+    h = hashlib.sha1()
+    h.update(str(arr.shape).encode("utf-8"))
+    h.update(arr.tobytes())
+    return h.hexdigest()[:16]
+
+
+def _top_m(ids: np.ndarray, sims: np.ndarray, m: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the m best (ids, sims) ordered by similarity, descending."""
+    m = min(m, len(ids))
+    if m <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    part = np.argpartition(sims, -m)[-m:]
+    order = part[np.argsort(sims[part])][::-1]
+    return ids[order].astype(np.int64), sims[order].astype(np.float32)
+
+
+def _top_m_rows(sims: np.ndarray, m: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row-wise _top_m over a (B, N) similarity block."""
+    part = np.argpartition(sims, -m, axis=1)[:, -m:]
+    part_sims = np.take_along_axis(sims, part, axis=1)
+    order = np.argsort(-part_sims, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_sims, order, axis=1)
+
+
+def _eligible_count(n: int, exclude: Optional[int], mask: Optional[np.ndarray]) -> int:
+    """Rows a search may return: all but `exclude`, restricted to `mask` when given."""
+    if mask is None:
+        return n - (exclude is not None)
+    return int(mask.sum()) - int(exclude is not None and bool(mask[exclude]))
+
+
+def _stack_neighbors(index, idxs: np.ndarray, m: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Batch neighbors for indexes without a native batched search."""
+    m = max(1, min(m, len(index) - 1))
+    ids = np.empty((len(idxs), m), dtype=np.int64)
+    sims = np.empty((len(idxs), m), dtype=np.float32)
+    for b, i in enumerate(idxs):
+        ids[b], sims[b] = index.neighbors(int(i), m)
+    return ids, sims
+
+
+class BruteForceIndex:
+    """Exact inner-product search over the full (normalized) embedding matrix."""
+
+    kind = "brute"
+
+    def __init__(self, embeddings: np.ndarray):
+        self.embeddings = embeddings
+
+    def __len__(self):
+        return self.embeddings.shape[0]
+
+    def search(self, query: np.ndarray, m: int, exclude: Optional[int] = None, mask: Optional[np.ndarray] = None):
+        """Top-m rows by inner product; `mask` (bool, per row) restricts results to eligible rows."""
+        sims = (self.embeddings @ query).astype(np.float32)
+        if mask is not None:
+            sims[~mask] = -np.inf
+        if exclude is not None:
+            sims[exclude] = -np.inf
+        m = min(m, _eligible_count(len(sims), exclude, mask))
+        return _top_m(np.arange(len(sims)), sims, m)
+
+    def neighbors(self, idx: int, m: int, mask: Optional[np.ndarray] = None):
+        return self.search(self.embeddings[idx], m, exclude=idx, mask=mask)
+
+    def batch_neighbors(self, idxs: np.ndarray, m: int, block: int = 256):
+        """Top-m neighbors for many rows with one (B, D) @ (D, N) product per block."""
+        idxs = np.asarray(idxs, dtype=np.int64)
+        m = max(1, min(m, len(self) - 1))
+        ids = np.empty((len(idxs), m), dtype=np.int64)
+        sims = np.empty((len(idxs), m), dtype=np.float32)
+        for start in range(0, len(idxs), block):
+            rows = idxs[start:start + block]
+            s = (np.asarray(self.embeddings[rows]) @ self.embeddings.T).astype(np.float32)
+            s[np.arange(len(rows)), rows] = -np.inf
+            ids[start:start + block], sims[start:start + block] = _top_m_rows(s, m)
+        return ids, sims
+
+
+class IVFIndex:
+    """Inverted-file index: spherical k-means coarse clusters over unit vectors.
+
+    A query scores the centroids, then only scans the closest lists until at
+    least `scan_factor * m` vectors have been gathered, so per-request cost grows
+    with the candidate pool instead of with the catalog. How many lists that
+    takes depends on how well the vectors cluster, so `tune()` picks
+    `scan_factor` by measuring recall against exact search on the index's own
+    embeddings; load_or_build_index tunes every index it builds.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, embeddings: np.ndarray, centroids: np.ndarray, order: np.ndarray,
+                 offsets: np.ndarray, fingerprint: str = "", scan_factor: int = 4):
+        self.embeddings = embeddings
+        self.centroids = centroids.astype(np.float32)
+        self.order = order.astype(np.int64)
+        self.offsets = offsets.astype(np.int64)
+        self.fingerprint = fingerprint
+        self.scan_factor = scan_factor
+        self.list_sizes = np.diff(self.offsets)
+
+    def __len__(self):
+        return self.embeddings.shape[0]
+
+    @property
+    def nlist(self) -> int:
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, nlist: Optional[int] = None, n_iter: int = 15,
+              seed: int = 42, fingerprint: Optional[str] = None) -> "IVFIndex":
+        n = embeddings.shape[0]
+        if nlist is None:
+            nlist = int(np.clip(np.sqrt(n), 1, 4096))
+        nlist = max(1, min(nlist, n))
+
+        rng = np.random.RandomState(seed)
+        centroids = embeddings[rng.choice(n, nlist, replace=False)].astype(np.float32)
+        assign = np.zeros(n, dtype=np.int64)
+        for _ in range(n_iter):
+            assign = _assign(embeddings, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, embeddings)
+            counts = np.bincount(assign, minlength=nlist)
+            empty = counts == 0
+            if empty.any():
+                # re-seed empty clusters with random points
+                sums[empty] = embeddings[rng.choice(n, int(empty.sum()), replace=False)]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+        assign = _assign(embeddings, centroids)
+
+        order = np.argsort(assign, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+        if fingerprint is None:
+            fingerprint = embeddings_fingerprint(embeddings)
+        return cls(embeddings, centroids, order, offsets, fingerprint)
+
+    def tune(self, target_recall: float = 0.95, m: int = 300, n_queries: int = 100, seed: int = 0) -> float:
+        """Double `scan_factor` until recall@m against exact search reaches `target_recall`.
+
+        Stops once a query would scan the whole catalog. Returns the recall reached.
+        """
+        while True:
+            recall = recall_vs_brute_force(self, self.embeddings, m=m, n_queries=n_queries, seed=seed)
+            if recall >= target_recall or self.scan_factor * m >= len(self):
+                return recall
+            self.scan_factor *= 2
+
+    def search(self, query: np.ndarray, m: int, exclude: Optional[int] = None, mask: Optional[np.ndarray] = None):
+        list_sizes = self.list_sizes
+        if mask is not None:
+            # probe until enough *eligible* vectors are gathered, so filters never starve the pool
+            eligible = np.concatenate([[0], np.cumsum(mask[self.order])])
+            list_sizes = eligible[self.offsets[1:]] - eligible[self.offsets[:-1]]
+        want = min(int(list_sizes.sum()), max(m * self.scan_factor, m + 1))
+        centroid_sims = self.centroids @ query
+        probe_order = np.argsort(centroid_sims)[::-1]
+        cum = np.cumsum(list_sizes[probe_order])
+        nprobe = int(np.searchsorted(cum, want) + 1)
+        lists = probe_order[:nprobe]
+
+        ids = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in lists])
+        if mask is not None:
+            ids = ids[mask[ids]]
+        sims = (self.embeddings[ids] @ query).astype(np.float32)
+        if exclude is not None:
+            in_ids = ids == exclude
+            sims[in_ids] = -np.inf
+            m = min(m, len(ids) - int(in_ids.any()))
+        return _top_m(ids, sims, m)
+
+    def neighbors(self, idx: int, m: int, mask: Optional[np.ndarray] = None):
+        return self.search(self.embeddings[idx], m, exclude=idx, mask=mask)
+
+    def batch_neighbors(self, idxs: np.ndarray, m: int):
+        return _stack_neighbors(self, idxs, m)
+
+    def save(self, path):
+        path = Path(path)
+        np.savez(path, centroids=self.centroids, order=self.order, offsets=self.offsets,
+                 fingerprint=np.array(self.fingerprint), scan_factor=np.array(self.scan_factor))
+
+    @classmethod
+    def load(cls, path, embeddings: np.ndarray, fingerprint: Optional[str] = None) -> Optional["IVFIndex"]:
+        """Load a persisted index; returns None when missing, untuned or built for other embeddings."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            stored_fp = str(data["fingerprint"])
+            if fingerprint is not None and stored_fp != fingerprint:
+                return None
+            if int(data["offsets"][-1]) != embeddings.shape[0] or "scan_factor" not in data.files:
+                return None
+            return cls(embeddings, data["centroids"], data["order"], data["offsets"], stored_fp,
+                       scan_factor=int(data["scan_factor"]))
+
+
+def _assign(embeddings: np.ndarray, centroids: np.ndarray, block: int = 8192) -> np.ndarray:
+    out = np.empty(embeddings.shape[0], dtype=np.int64)
+    for start in range(0, embeddings.shape[0], block):
+        out[start:start + block] = np.argmax(embeddings[start:start + block] @ centroids.T, axis=1)
+    return out
+
+
+class QuantizedIndex:
+    """Flat scan over int8 codes of the embeddings, rescored in float32.
+
+    Each dimension is scaled into int8 (4x smaller than float32). The scan
+    keeps the best `rescore_factor * m` rows, which are then rescored exactly
+    against the float32 embeddings (only those rows are paged in).
+
+    Codes are widened `scan_block` rows at a time into a per-thread float32
+    scratch buffer small enough to stay in cache, so the scan reads a quarter
+    of the bytes of a float32 scan and allocates nothing per query. NumPy has
+    no fast integer matmul, so scoring the codes as integers is slower still.
+    There is no float16 mode: NumPy's float16 matmul is not vectorized and a
+    half-precision scan ran 4-8x slower than the float32 one it replaced.
+    """
+
+    MODES = ("int8",)
+
+    def __init__(self, embeddings: np.ndarray, mode: str = "int8", rescore_factor: int = 2,
+                 block: int = 8192, scan_block: int = 512):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown quantization mode '{mode}'. Expected one of {self.MODES}.")
+        self.embeddings = embeddings
+        self.mode = mode
+        self.kind = f"brute-{mode}"
+        self.rescore_factor = rescore_factor
+        self.scan_block = scan_block
+        scales = np.abs(embeddings).max(axis=0).astype(np.float32) / 127.0
+        scales[scales == 0] = 1.0
+        self.scales = scales
+        self.codes = np.empty(embeddings.shape, dtype=np.int8)
+        for start in range(0, embeddings.shape[0], block):
+            chunk = np.asarray(embeddings[start:start + block], dtype=np.float32)
+            self.codes[start:start + block] = np.clip(np.rint(chunk / scales), -127, 127)
+        self._local = threading.local()
+
+    def __len__(self):
+        return self.embeddings.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.scales.nbytes)
+
+    def _scratch(self) -> np.ndarray:
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None:
+            scratch = self._local.scratch = np.empty((self.scan_block, self.codes.shape[1]), dtype=np.float32)
+        return scratch
+
+    def approx_scores(self, query: np.ndarray) -> np.ndarray:
+        q = (query * self.scales).astype(np.float32)
+        n = self.codes.shape[0]
+        out = np.empty(n, dtype=np.float32)
+        scratch = self._scratch()
+        for start in range(0, n, self.scan_block):
+            codes = self.codes[start:start + self.scan_block]
+            buf = scratch[:len(codes)]
+            np.copyto(buf, codes, casting="unsafe")
+            np.dot(buf, q, out=out[start:start + len(codes)])
+        return out
+
+    def search(self, query: np.ndarray, m: int, exclude: Optional[int] = None, mask: Optional[np.ndarray] = None):
+        approx = self.approx_scores(query)
+        n = len(approx)
+        if mask is not None:
+            approx[~mask] = -np.inf
+        if exclude is not None:
+            approx[exclude] = -np.inf
+        m = min(m, _eligible_count(n, exclude, mask))
+        shortlist, _ = _top_m(np.arange(n), approx, min(n, m * self.rescore_factor))
+        if exclude is not None:
+            shortlist = shortlist[shortlist != exclude]
+        if mask is not None:
+            shortlist = shortlist[mask[shortlist]]
+        exact = (self.embeddings[shortlist] @ query).astype(np.float32)
+        return _top_m(shortlist, exact, m)
+
+    def neighbors(self, idx: int, m: int, mask: Optional[np.ndarray] = None):
+        return self.search(np.asarray(self.embeddings[idx], dtype=np.float32), m, exclude=idx, mask=mask)
+
+    def batch_neighbors(self, idxs: np.ndarray, m: int):
+        return _stack_neighbors(self, idxs, m)
+
+
+INDEX_TYPES = {"brute": BruteForceIndex, "ivf": IVFIndex}
+
+# below this many rows a full scan is as fast as probing and is exact, and the
+# sqrt(N) lists are too coarse for the probe to keep recall up; "ivf" is refused
+AUTO_IVF_MIN_ROWS = 20_000
+
+# recall@IVF_TUNE_M against exact search that a freshly built IVF index is tuned to
+IVF_TARGET_RECALL = 0.95
+IVF_TUNE_M = 300
+
+# below this many rows the float32 matrix is a few MB and already cache-resident,
+# so an int8 scan saves no memory worth having and only adds the widening cost
+QUANTIZE_MIN_ROWS = 20_000
+
+
+def load_or_build_index(embeddings: np.ndarray, index_type: str = "auto", index_path=None,
+                        fingerprint: Optional[str] = None, quantization: Optional[str] = None):
+    """Return a stage-1 index for `embeddings`, reusing the persisted one if still valid.
+
+    index_type: "brute", "ivf", or "auto" (IVF only once the catalog is large;
+    an explicit "ivf" on a smaller catalog falls back to brute force).
+    quantization: None or "int8" -- compressed flat scan with float32 rescoring
+    (ignored, with a warning, below QUANTIZE_MIN_ROWS).
+    """
+    if quantization:
+        if index_type not in ("auto", "brute"):
+            raise ValueError("Quantization applies to the flat scan; use index_type='brute' or 'auto'.")
+        if quantization not in QuantizedIndex.MODES:
+            raise ValueError(f"Unknown quantization mode '{quantization}'. Expected one of {QuantizedIndex.MODES}.")
+        if embeddings.shape[0] >= QUANTIZE_MIN_ROWS:
+            return QuantizedIndex(embeddings, mode=quantization)
+        print(f"[WARN] {quantization} scan only pays off from {QUANTIZE_MIN_ROWS} rows; "
+              f"using the float32 scan for {embeddings.shape[0]}.")
+        return BruteForceIndex(embeddings)
+    if index_type == "auto":
+        index_type = "ivf" if embeddings.shape[0] >= AUTO_IVF_MIN_ROWS else "brute"
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}'. Expected one of {sorted(INDEX_TYPES)} or 'auto'.")
+    if index_type == "ivf" and embeddings.shape[0] < AUTO_IVF_MIN_ROWS:
+        print(f"[WARN] IVF needs at least {AUTO_IVF_MIN_ROWS} rows to keep recall; "
+              f"using brute force for {embeddings.shape[0]}.")
+        index_type = "brute"
+    if index_type == "brute":
+        return BruteForceIndex(embeddings)
+
+    fp = fingerprint or embeddings_fingerprint(embeddings)
+    index = IVFIndex.load(index_path, embeddings, fingerprint=fp) if index_path else None
+    if index is None:
+        t0 = time.perf_counter()
+        index = IVFIndex.build(embeddings, fingerprint=fp)
+        recall = index.tune(IVF_TARGET_RECALL, m=IVF_TUNE_M)
+        print(f"[INFO] Built IVF index: nlist={index.nlist}, scan_factor={index.scan_factor} "
+              f"(recall@{IVF_TUNE_M} {recall:.3f}) in {time.perf_counter() - t0:.2f}s")
+        if index_path:
+            index.save(index_path)
+    return index
+
+
+class NeighborTable:
+    """Offline top-M neighbors per problem, served as an O(M) row lookup.
+
+    Rows the table does not cover (problems added after it was built, or
+    requests for more than M neighbors) are answered by the live `fallback` index.
+    """
+
+    def __init__(self, ids: np.ndarray, sims: np.ndarray, fallback, exact_sims: bool = True):
+        self.ids = ids
+        self.sims = sims
+        self.fallback = fallback
+        self.exact_sims = exact_sims
+        self.kind = f"table+{fallback.kind}"
+
+    def __len__(self):
+        return len(self.fallback)
+
+    @property
+    def embeddings(self):
+        return self.fallback.embeddings
+
+    def search(self, query: np.ndarray, m: int, exclude: Optional[int] = None, mask: Optional[np.ndarray] = None):
+        return self.fallback.search(query, m, exclude=exclude, mask=mask)
+
+    def neighbors(self, idx: int, m: int, mask: Optional[np.ndarray] = None):
+        if idx < self.ids.shape[0] and m <= self.ids.shape[1] and self.ids[idx, 0] >= 0:
+            if mask is None:
+                ids = self.ids[idx, :m].astype(np.int64)
+            else:
+                # the filtered row is usable only if it still holds m eligible ids (or all of them)
+                row = self.ids[idx]
+                row = row[mask[row]]
+                if len(row) < min(m, _eligible_count(len(mask), idx, mask)):
+                    return self.fallback.neighbors(idx, m, mask=mask)
+                ids = row[:m].astype(np.int64)
+            if not self.exact_sims:
+                pos = np.arange(len(ids)) if mask is None else np.flatnonzero(mask[self.ids[idx]])[:m]
+                return ids, self.sims[idx, pos].astype(np.float32)
+            # an O(M*D) rescore keeps the emb_sim feature at float32 precision
+            return ids, (self.embeddings[ids] @ self.embeddings[idx]).astype(np.float32)
+        return self.fallback.neighbors(idx, m, mask=mask)
+
+    def batch_neighbors(self, idxs: np.ndarray, m: int):
+        idxs = np.asarray(idxs, dtype=np.int64)
+        m = max(1, min(m, len(self) - 1))
+        if m > self.ids.shape[1]:
+            return self.fallback.batch_neighbors(idxs, m)
+        covered = idxs < self.ids.shape[0]
+        covered[covered] = self.ids[idxs[covered], 0] >= 0
+        ids = np.empty((len(idxs), m), dtype=np.int64)
+        sims = np.empty((len(idxs), m), dtype=np.float32)
+        if covered.any():
+            rows = idxs[covered]
+            ids[covered] = self.ids[rows, :m]
+            if self.exact_sims:
+                sims[covered] = np.einsum("bmd,bd->bm", self.embeddings[ids[covered]], self.embeddings[rows])
+            else:
+                sims[covered] = self.sims[rows, :m]
+        if (~covered).any():
+            ids[~covered], sims[~covered] = self.fallback.batch_neighbors(idxs[~covered], m)
+        return ids, sims
+
+
+def build_neighbor_table(embeddings: np.ndarray, m: int = 400, block: int = 1024):
+    """Exact top-m neighbors of every row as (int32 ids, float16 sims), best first."""
+    n = embeddings.shape[0]
+    m = max(1, min(m, n - 1))
+    ids = np.empty((n, m), dtype=np.int32)
+    sims = np.empty((n, m), dtype=np.float16)
+    for start in range(0, n, block):
+        stop = min(n, start + block)
+        s = embeddings[start:stop] @ embeddings.T
+        s[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        ids[start:stop], sims[start:stop] = _top_m_rows(s, m)
+    return ids, sims
+
+
+def neighbor_table_paths(out_dir, prefix: str = "sbert_neighbors"):
+    out_dir = Path(out_dir)
+    return out_dir / f"{prefix}_idx.npy", out_dir / f"{prefix}_sim.npy", out_dir / f"{prefix}_meta.json"
+
+
+def save_neighbor_table(ids: np.ndarray, sims: np.ndarray, embeddings: np.ndarray, out_dir,
+                        fingerprint: Optional[str] = None):
+    idx_path, sim_path, meta_path = neighbor_table_paths(out_dir)
+    if fingerprint is None or ids.shape[0] != embeddings.shape[0]:
+        fingerprint = embeddings_fingerprint(embeddings[:ids.shape[0]])
+    np.save(idx_path, ids)
+    np.save(sim_path, sims)
+    with open(meta_path, "w") as f:
+        json.dump({"rows": int(ids.shape[0]), "m": int(ids.shape[1]),
+                   "fingerprint": fingerprint}, f)
+
+
+def load_neighbor_table(out_dir, embeddings: np.ndarray, fallback, fingerprint: Optional[str] = None):
+    """Memory-map the neighbor table over `fallback`; returns `fallback` alone if absent or stale."""
+    idx_path, sim_path, meta_path = neighbor_table_paths(out_dir)
+    if not (idx_path.exists() and sim_path.exists() and meta_path.exists()):
+        return fallback
+    with open(meta_path) as f:
+        meta = json.load(f)
+    rows = int(meta.get("rows", 0))
+    if rows > embeddings.shape[0]:
+        return fallback
+    if rows != embeddings.shape[0] or fingerprint is None:
+        fingerprint = embeddings_fingerprint(embeddings[:rows])
+    if meta.get("fingerprint") != fingerprint:
+        print(f"[WARN] Neighbor table at {idx_path} is stale; using live retrieval.")
+        return fallback
+    ids = np.load(idx_path, mmap_mode="r")
+    sims = np.load(sim_path, mmap_mode="r")
+    return NeighborTable(ids, sims, fallback)
+
+
+def recall_vs_brute_force(index, embeddings: np.ndarray, m: int = 300, n_queries: int = 200, seed: int = 0) -> float:
+    """Mean recall@m of `index` against exact search, querying with catalog items."""
+    exact = BruteForceIndex(embeddings)
+    rng = np.random.RandomState(seed)
+    queries = rng.choice(embeddings.shape[0], min(n_queries, embeddings.shape[0]), replace=False)
+    recalls = []
+    for q in queries:
+        truth, _ = exact.neighbors(int(q), m)
+        got, _ = index.neighbors(int(q), m)
+        recalls.append(len(np.intersect1d(truth, got)) / max(1, len(truth)))
+    return float(np.mean(recalls))
+
+
+def benchmark_latency(index, embeddings: np.ndarray, m: int = 300, n_queries: int = 200, seed: int = 0) -> dict:
+    """Per-query latency (ms) of `index.neighbors` over random catalog queries."""
+    rng = np.random.RandomState(seed)
+    queries = rng.choice(embeddings.shape[0], min(n_queries, embeddings.shape[0]), replace=False)
+    timings = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.neighbors(int(q), m)
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings = np.array(timings)
+    return {"p50_ms": float(np.percentile(timings, 50)), "p99_ms": float(np.percentile(timings, 99)),
+            "mean_ms": float(timings.mean())}
+
+
+def _synthetic_embeddings(n: int, dim: int = 384, n_topics: int = 200, seed: int = 0) -> np.ndarray:
+    """Clustered unit vectors roughly shaped like sentence embeddings."""
+    rng = np.random.RandomState(seed)
+    topics = rng.normal(size=(n_topics, dim)).astype(np.float32)
+    emb = topics[rng.randint(0, n_topics, n)] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    return emb
+
+
+def _real_embeddings(path=None) -> Optional[np.ndarray]:
+    """The serving embeddings (store, pickle or .npy), normalized; None when not built yet."""
+    from src.modeling.embedding_store import normalize_rows, open_store
+    base = Path(__file__).resolve().parents[2]
+    candidates = [Path(path)] if path else [base / "models" / "sbert_embeddings.bin",
+                                            base / "models" / "sbert_recommender.pkl",
+                                            base / "models" / "embeddings.npy"]
+    for p in candidates:
+        if not p.exists():
+            continue
+        if p.suffix == ".npy":
+            return normalize_rows(np.load(p))
+        if p.suffix == ".pkl":
+            import pickle
+            with open(p, "rb") as f:
+                return normalize_rows(pickle.load(f)["embeddings"])
+        return np.asarray(open_store(p)[0], dtype=np.float32)
+    return None
+
+
+if __name__ == "__main__":
+    # python -m src.modeling.ann_index [embeddings path]
+    # Recall is only meaningful on the real SBERT vectors; the synthetic sets cluster
+    # far more cleanly than sentence embeddings and only stand in for timing.
+    import sys
+    real = _real_embeddings(sys.argv[1] if len(sys.argv) > 1 else None)
+    datasets = [("real", real)] if real is not None else []
+    if real is None:
+        print("[WARN] No serving embeddings found; recall below is on synthetic vectors and is optimistic.")
+    datasets += [("synthetic", _synthetic_embeddings(n)) for n in (4_000, 100_000)]
+    for label, emb in datasets:
+        n = emb.shape[0]
+        brute = BruteForceIndex(emb)
+        ivf = IVFIndex.build(emb)
+        print(f"\n=== {label} N={n}, nlist={ivf.nlist} ===")
+        print(f"IVF recall@300 vs brute force (scan_factor={ivf.scan_factor}): {recall_vs_brute_force(ivf, emb):.4f}")
+        recall = ivf.tune(IVF_TARGET_RECALL, m=IVF_TUNE_M)
+        print(f"tuned to scan_factor={ivf.scan_factor}: recall@300 {recall:.4f}")
+        print(f"brute latency: {benchmark_latency(brute, emb)}")
+        print(f"ivf   latency: {benchmark_latency(ivf, emb)}")
+        if n <= 20_000:
+            ids, sims = build_neighbor_table(emb, m=400)
+            table = NeighborTable(ids, sims, brute)
+            print(f"table recall@300: {recall_vs_brute_force(table, emb):.4f}")
+            print(f"table latency: {benchmark_latency(table, emb)}")
+        print(f"float32 footprint: {emb.nbytes / 1e6:.1f} MB")
+        for mode in QuantizedIndex.MODES:
+            quant = QuantizedIndex(emb, mode=mode)
+            print(f"{mode:>7} footprint: {quant.nbytes / 1e6:.1f} MB, "
+                  f"recall@300: {recall_vs_brute_force(quant, emb):.4f}, latency: {benchmark_latency(quant, emb)}")
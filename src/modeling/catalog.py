@@ -0,0 +1,145 @@
+# src/modeling/catalog.py
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.modeling.features import DIFFICULTY_LADDER, difficulty_codes
+
+
+class ProblemRow:
+    """Lightweight view of one catalog row; attribute reads go straight to the column arrays."""
+
+    __slots__ = ("catalog", "idx")
+
+    def __init__(self, catalog: "ProblemCatalog", idx: int):
+        self.catalog = catalog
+        self.idx = idx
+
+    def __getattr__(self, name):
+        try:
+            return self.catalog.columns[name][self.idx]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self):
+        return f"ProblemRow(idx={self.idx}, frontend_id={self.frontend_id}, title={self.title!r})"
+
+    def to_dict(self, fields=("frontend_id", "title", "difficulty", "topic_tags")) -> dict:
+        cols = self.catalog.columns
+        return {f: _py(cols[f][self.idx]) for f in fields}
+
+
+def _py(value):
+    """NumPy scalar -> plain Python value, for JSON responses."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ProblemCatalog:
+    """Columnar, read-only problem catalog for the request path.
+
+    Columns are NumPy arrays indexed by row (the same row order as the
+    embeddings), with hash indexes from frontend_id, titleSlug and clean_title
+    to row so lookups are O(1) instead of DataFrame scans.
+    """
+
+    COLUMNS = ("frontend_id", "title", "titleSlug", "difficulty", "topic_tags", "tag_list",
+               "clean_title", "is_premium", "problem_URL", "similar_questions", "difficulty_code")
+
+    def __init__(self, columns: dict, frame: Optional[pd.DataFrame] = None):
+        self.columns = columns
+        self.frame = frame  # original DataFrame, kept for offline code (evaluation, notebooks)
+        self.frontend_id = columns["frontend_id"]
+        self.title = columns["title"]
+        self.difficulty = columns["difficulty"]
+        self.difficulty_code = columns["difficulty_code"]  # int8: 0 easy, 1 medium, 2 hard
+        self.topic_tags = columns["topic_tags"]
+        self.tag_list = columns["tag_list"]
+        self.problem_URL = columns["problem_URL"]
+        self._by_id = {int(v): i for i, v in enumerate(self.frontend_id)}
+        self._by_slug = {str(v): i for i, v in enumerate(columns["titleSlug"])}
+        self._by_clean_title = {str(v): i for i, v in enumerate(columns["clean_title"])}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ProblemCatalog":
+        """Build from the loaded DataFrame (expects load_resources' clean_title / tag_list columns)."""
+        n = len(df)
+
+        def col(name, default=""):
+            values = df[name] if name in df.columns else pd.Series([default] * n)
+            out = np.empty(n, dtype=object)
+            out[:] = values.tolist()
+            return out
+
+        clean = col("clean_title")
+        columns = {
+            "frontend_id": df["frontend_id"].to_numpy(dtype=np.int64),
+            "title": col("title"),
+            "titleSlug": col("titleSlug"),
+            "difficulty": col("difficulty", "Medium"),
+            "topic_tags": col("topic_tags"),
+            "tag_list": col("tag_list", []),
+            "clean_title": clean,
+            "is_premium": (df["is_premium"].astype(str).str.lower() == "true").to_numpy()
+            if "is_premium" in df.columns else np.zeros(n, dtype=bool),
+            "problem_URL": np.array([f"https://leetcode.com/problems/{t.replace(' ', '-')}/" for t in clean], dtype=object),
+            "similar_questions": col("similar_questions"),
+        }
+        columns["difficulty_code"] = difficulty_codes(pd.DataFrame({"difficulty": columns["difficulty"]}))
+        return cls(columns, frame=df)
+
+    def __len__(self):
+        return len(self.frontend_id)
+
+    def __getitem__(self, idx: int) -> ProblemRow:
+        return ProblemRow(self, int(idx))
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def row_of(self, frontend_id: int) -> Optional[int]:
+        return self._by_id.get(int(frontend_id))
+
+    def row_of_slug(self, slug: str) -> Optional[int]:
+        return self._by_slug.get(slug)
+
+    def row_of_title(self, clean_title: str) -> Optional[int]:
+        return self._by_clean_title.get(clean_title)
+
+    def filter_mask(self, tag_index=None, difficulty=None, tags=None, match_all_tags: bool = True,
+                    exclude_premium: bool = False, exclude_rows=None) -> Optional[np.ndarray]:
+        """Boolean mask of rows passing the filters, or None when no filter is set.
+
+        difficulty: names ("Easy", "medium", ...), any of which may match.
+        tags: topic tags matched through `tag_index` (a TagIndex); with
+        match_all_tags=False a row needs only one of them. Unknown tags match
+        nothing. Raises ValueError for unknown difficulty names.
+        """
+        if not (difficulty or tags or exclude_premium or exclude_rows is not None):
+            return None
+        mask = np.ones(len(self), dtype=bool)
+        if difficulty:
+            wanted = [str(d).lower().strip() for d in difficulty]
+            unknown = [d for d in wanted if d not in DIFFICULTY_LADDER]
+            if unknown:
+                raise ValueError(f"Unknown difficulty {unknown}; expected one of {list(DIFFICULTY_LADDER)}.")
+            mask &= np.isin(self.difficulty_code, [DIFFICULTY_LADDER[d] for d in wanted])
+        if tags:
+            if tag_index is None:
+                raise ValueError("Tag filters need a tag index.")
+            wanted = [str(t).lower().strip() for t in tags]
+            known = [t for t in wanted if t in tag_index.tag_id]
+            if (match_all_tags and len(known) < len(wanted)) or not known:
+                mask[:] = False
+            else:
+                mask &= tag_index.mask_having(known, match_all=match_all_tags)
+        if exclude_premium:
+            mask &= ~self.columns["is_premium"]
+        if exclude_rows is not None and len(exclude_rows):
+            mask[np.asarray(exclude_rows, dtype=np.int64)] = False
+        return mask
+
+    def records(self, rows, fields=("frontend_id", "title", "difficulty", "topic_tags")) -> list:
+        """Plain dicts for `rows`, built from column gathers."""
+        cols = [(f, self.columns[f]) for f in fields]
+        return [{f: _py(c[r]) for f, c in cols} for r in rows]
@@ -0,0 +1,258 @@
+# src/modeling/dataset_store.py
+"""Columnar binary copy of preprocessed_data.csv.
+
+`preprocess_data` writes it next to the CSV (preprocessed_data.npz) and
+readers ask `load_dataset(csv_path, columns)` for just the columns they use.
+Those come back without running the CSV tokenizer, and the list columns
+without any ast.literal_eval.
+
+Layout: an uncompressed .npz, so np.load reads members lazily and a
+projection only touches the members of the requested columns.
+    __meta__                    JSON: version, rows, source CSV size, columns {name: kind, dtype}
+    <col>                       "numeric" / "bool" columns in their own dtype
+    <col>.offsets, <col>.data   "string" columns: int64 character offsets (rows + 1)
+                                into one UTF-8 blob
+    <col>.valid                 bool mask, only for string columns with missing values
+    <col>.lists                 "list" columns: int64 offsets (rows + 1) into the
+                                items, which are stored like a string column
+
+Derived columns, computed once when the bundle is written (and on the fly
+when a reader falls back to the CSV):
+    clean_title          clean_title(title)
+    tag_list             to_tag_list(topic_tags)
+    similar_questions    parse_similar_raw() of the CSV text, as a list of titles
+"""
+import ast
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+META_KEY = "__meta__"
+
+
+def clean_title(text: str) -> str:
+    text = str(text).lower().strip()
+    text = re.sub(r'^\d+\.\s*', '', text)
+    text = re.sub(r'[^a-z0-9\s\-]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+def to_tag_list(s) -> list:
+    if isinstance(s, str) and s.strip().startswith('['):
+        try:
+            vals = ast.literal_eval(s)
+            return [str(v).lower().strip() for v in vals if v]
+        except Exception:
+            pass
+    return [t.strip().lower() for t in str(s).split(',') if t.strip()]
+
+def parse_similar_raw(x):
+    """Unwrap deeply nested or triple-encoded similar_questions safely."""
+    if isinstance(x, (list, tuple)):
+        return list(x)  # already parsed (columnar bundle)
+    if not isinstance(x, str) or not x.strip() or x.strip() in ["[]", "nan"]:
+        return []
+
+    s = x.strip()
+    for _ in range(5):
+        try:
+            data = ast.literal_eval(s)
+        except Exception:
+            break
+
+        if isinstance(data, list) and len(data) == 1 and isinstance(data[0], str):
+            s = data[0]
+            continue
+
+        if isinstance(data, list) and all(isinstance(i, str) for i in data):
+            cleaned = []
+            for i in data:
+                i = re.sub(r"^['\"\[]+|['\"\]]+$", "", i).strip()
+                if i:
+                    cleaned.append(i.lower())
+            return cleaned
+
+        if isinstance(data, str) and ("[" in data and "]" in data):
+            s = data
+            continue
+
+        break
+
+    return []
+
+# derived column -> (source column, parser); similar_questions replaces its own text
+DERIVED = {
+    "clean_title": ("title", clean_title),
+    "tag_list": ("topic_tags", to_tag_list),
+    "similar_questions": ("similar_questions", parse_similar_raw),
+}
+
+
+def bundle_path(csv_path) -> Path:
+    return Path(csv_path).with_suffix(".npz")
+
+
+def _encode_strings(values):
+    """(char offsets, UTF-8 blob) for a sequence of str."""
+    lengths = np.fromiter((len(v) for v in values), dtype=np.int64, count=len(values))
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    blob = "".join(values).encode("utf-8")
+    return offsets, np.frombuffer(blob, dtype=np.uint8)
+
+
+def _decode_strings(offsets: np.ndarray, data: np.ndarray) -> list:
+    text = data.tobytes().decode("utf-8")
+    bounds = offsets.tolist()
+    return [text[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+
+def _with_derived(df: pd.DataFrame, wanted=None) -> pd.DataFrame:
+    for name, (source, parse) in DERIVED.items():
+        if source in df.columns and (wanted is None or name in wanted):
+            df[name] = df[source].apply(parse)
+    return df
+
+
+def write_dataset(df: pd.DataFrame, path, source_size: Optional[int] = None) -> Path:
+    """Write `df` (CSV-typed, plus any derived columns) as a bundle; returns the path."""
+    path = Path(path)
+    arrays, columns = {}, {}
+    for name in df.columns:
+        series = df[name]
+        values = series.to_numpy(dtype=object) if not pd.api.types.is_numeric_dtype(series) else None
+        if values is not None and len(values) and all(isinstance(v, list) for v in values):
+            items = [str(item) for v in values for item in v]
+            lists = np.zeros(len(values) + 1, dtype=np.int64)
+            np.cumsum([len(v) for v in values], out=lists[1:])
+            arrays[f"{name}.lists"] = lists
+            arrays[f"{name}.offsets"], arrays[f"{name}.data"] = _encode_strings(items)
+            columns[name] = {"kind": "list", "dtype": "str"}
+        elif values is not None and not pd.api.types.is_bool_dtype(series):
+            valid = np.array([isinstance(v, str) for v in values], dtype=bool)
+            strings = [v if ok else "" for v, ok in zip(values, valid)]
+            arrays[f"{name}.offsets"], arrays[f"{name}.data"] = _encode_strings(strings)
+            if not valid.all():
+                arrays[f"{name}.valid"] = valid
+            columns[name] = {"kind": "string", "dtype": "str"}
+        else:
+            data = series.to_numpy()
+            arrays[name] = data
+            columns[name] = {"kind": "bool" if data.dtype == bool else "numeric", "dtype": data.dtype.str}
+
+    meta = {"version": FORMAT_VERSION, "rows": len(df), "source_size": source_size, "columns": columns}
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, **{META_KEY: np.array(json.dumps(meta))}, **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+def convert_csv(csv_path, path=None) -> Path:
+    """Parse `csv_path` once and write its bundle (default: next to it, .npz)."""
+    csv_path = Path(csv_path)
+    df = _with_derived(pd.read_csv(csv_path))
+    return write_dataset(df, path or bundle_path(csv_path), source_size=csv_path.stat().st_size)
+
+
+def read_dataset(path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """The bundle's columns (all, or those in `columns` that it has, in file order)."""
+    with np.load(path, allow_pickle=False) as z:
+        meta = json.loads(str(z[META_KEY]))
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{Path(path).name}: unsupported dataset format {meta.get('version')}")
+        n = meta["rows"]
+        out = {}
+        for name, spec in meta["columns"].items():
+            if columns is not None and name not in columns:
+                continue
+            kind = spec["kind"]
+            if kind in ("numeric", "bool"):
+                out[name] = z[name]
+                continue
+            strings = _decode_strings(z[f"{name}.offsets"], z[f"{name}.data"])
+            values = np.empty(n, dtype=object)
+            if kind == "list":
+                bounds = z[f"{name}.lists"].tolist()
+                values[:] = [strings[bounds[i]:bounds[i + 1]] for i in range(n)]
+            else:
+                values[:] = strings
+                if f"{name}.valid" in z.files:
+                    values[~z[f"{name}.valid"]] = np.nan
+            out[name] = values
+    return pd.DataFrame(out)
+
+
+def _fresh_bundle(csv_path: Path) -> Optional[Path]:
+    """The bundle for `csv_path` if it exists and was written from the current CSV."""
+    path = bundle_path(csv_path)
+    if not path.exists():
+        return None
+    if not csv_path.exists():
+        return path
+    csv_stat = csv_path.stat()
+    with np.load(path, allow_pickle=False) as z:
+        source_size = json.loads(str(z[META_KEY])).get("source_size")
+    if csv_stat.st_mtime > path.stat().st_mtime or source_size not in (None, csv_stat.st_size):
+        print(f"[WARN] {csv_path.name} is newer than {path.name}; re-run src.modeling.dataset_store to convert it.")
+        return None
+    return path
+
+
+def load_dataset(csv_path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Preprocessed problems with only `columns` (None = all, derived columns included).
+
+    Reads the columnar bundle when it is up to date and falls back to the CSV
+    (parsing derived columns on the fly) otherwise. Requested columns the data
+    does not have are left out, like read_csv(usecols=callable).
+    """
+    csv_path = Path(csv_path)
+    path = _fresh_bundle(csv_path)
+    if path is not None:
+        return read_dataset(path, columns)
+
+    if columns is None:
+        return _with_derived(pd.read_csv(csv_path))
+    wanted = set(columns)
+    sources = {source for name, (source, _) in DERIVED.items() if name in wanted}
+    df = pd.read_csv(csv_path, usecols=lambda c: c in wanted or c in sources)
+    df = _with_derived(df, wanted)
+    return df[[c for c in df.columns if c in wanted]]
+
+
+def iter_dataset(csv_path, columns: List[str], chunk_size: int = 1000) -> Iterator[pd.DataFrame]:
+    """`load_dataset` in frames of `chunk_size` rows; streams the CSV when there is no bundle."""
+    csv_path = Path(csv_path)
+    if _fresh_bundle(csv_path) is None and not any(c in DERIVED for c in columns):
+        yield from pd.read_csv(csv_path, usecols=lambda c: c in columns, chunksize=chunk_size)
+        return
+    df = load_dataset(csv_path, columns)
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+if __name__ == "__main__":
+    # python -m src.modeling.dataset_store [csv_path]   convert, then time a projected read both ways
+    base = Path(__file__).resolve().parents[2]
+    csv = Path(sys.argv[1]) if len(sys.argv) > 1 else base / "data" / "processed" / "preprocessed_data.csv"
+    out = convert_csv(csv)
+    print(f"[INFO] Wrote {out} ({out.stat().st_size / 1e6:.1f} MB, CSV {csv.stat().st_size / 1e6:.1f} MB)")
+
+    serving = ["frontend_id", "title", "titleSlug", "difficulty", "is_premium", "topic_tags",
+               "acceptance", "likes", "submission", "clean_title", "tag_list", "similar_questions"]
+    for label, read in (
+        ("csv + parse", lambda: _with_derived(pd.read_csv(csv))),
+        ("bundle (all)", lambda: read_dataset(out)),
+        ("bundle (serving cols)", lambda: read_dataset(out, serving)),
+    ):
+        start = time.perf_counter()
+        df = read()
+        print(f"[INFO] {label:<22} {(time.perf_counter() - start) * 1000:8.1f} ms  {df.shape}")
@@ -0,0 +1,105 @@
+# src/modeling/embedding_store.py
+"""Flat on-disk embedding store opened with np.memmap.
+
+Layout: a fixed 64-byte header followed by the row-major matrix of
+L2-normalized vectors. Because the data region is read straight from the
+file, every uvicorn worker that opens the same store shares one copy in the
+OS page cache instead of unpickling its own.
+
+Header (little-endian):
+    magic        8s   b"LCEMB\\x00\\x01\\x00"
+    dtype code   u1   0 = float32, 1 = float16
+    (pad)        3x
+    dim          u4
+    rows         u8
+    fingerprint  16s  embeddings_fingerprint() of the float32 rows
+    (pad)        to 64 bytes
+"""
+import os
+import pickle
+import struct
+import sys
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+from src.modeling.ann_index import embeddings_fingerprint
+
+MAGIC = b"LCEMB\x00\x01\x00"
+HEADER_FMT = "<8sB3xIQ16s"
+HEADER_SIZE = 64
+DTYPES = {0: np.float32, 1: np.float16}
+
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if np.isnan(embeddings).any():
+        raise RuntimeError("Embeddings contain NaNs.")
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms.astype(np.float32)
+
+
+def write_store(embeddings: np.ndarray, path, dtype=np.float32) -> str:
+    """Normalize `embeddings` and write them as a store; returns the fingerprint."""
+    code = {np.dtype(v): k for k, v in DTYPES.items()}.get(np.dtype(dtype))
+    if code is None:
+        raise ValueError(f"Unsupported store dtype: {dtype}")
+    embeddings = normalize_rows(embeddings)
+    fingerprint = embeddings_fingerprint(embeddings)
+    rows, dim = embeddings.shape
+
+    header = struct.pack(HEADER_FMT, MAGIC, code, dim, rows, fingerprint.encode("ascii"))
+    header = header.ljust(HEADER_SIZE, b"\x00")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(np.ascontiguousarray(embeddings, dtype=DTYPES[code]).tobytes())
+    os.replace(tmp_path, path)
+    return fingerprint
+
+
+def read_header(path) -> dict:
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise RuntimeError(f"Embedding store header truncated: {path}")
+    magic, code, dim, rows, fingerprint = struct.unpack_from(HEADER_FMT, raw)
+    if magic != MAGIC:
+        raise RuntimeError(f"Not an embedding store (bad magic): {path}")
+    if code not in DTYPES:
+        raise RuntimeError(f"Unknown dtype code {code} in {path}")
+    return {"dtype": DTYPES[code], "dim": dim, "rows": rows, "fingerprint": fingerprint.decode("ascii")}
+
+
+def open_store(path, verify: bool = False) -> Tuple[np.ndarray, str]:
+    """Memory-map a store read-only; returns (embeddings, fingerprint).
+
+    With verify=True the data is hashed against the header (reads every page).
+    """
+    header = read_header(path)
+    expected = HEADER_SIZE + header["rows"] * header["dim"] * np.dtype(header["dtype"]).itemsize
+    if os.path.getsize(path) != expected:
+        raise RuntimeError(f"Embedding store size mismatch: {path}")
+    embeddings = np.memmap(path, dtype=header["dtype"], mode="r", offset=HEADER_SIZE,
+                           shape=(header["rows"], header["dim"]))
+    if verify and embeddings_fingerprint(embeddings) != header["fingerprint"]:
+        raise RuntimeError(f"Embedding store checksum mismatch: {path}")
+    return embeddings, header["fingerprint"]
+
+
+def convert_pickle(pkl_path, store_path) -> str:
+    """Convert the legacy sbert_recommender.pkl cache into a store."""
+    with open(pkl_path, "rb") as f:
+        cache = pickle.load(f)
+    fingerprint = write_store(cache.get("embeddings"), store_path)
+    print(f"Embedding store written to {store_path} (fingerprint {fingerprint})")
+    return fingerprint
+
+
+if __name__ == "__main__":
+    base = Path(__file__).resolve().parents[2] / "models"
+    src = sys.argv[1] if len(sys.argv) > 1 else base / "sbert_recommender.pkl"
+    dst = sys.argv[2] if len(sys.argv) > 2 else base / "sbert_embeddings.bin"
+    convert_pickle(src, dst)
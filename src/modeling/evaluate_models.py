@@ -1,43 +1,9 @@
-import ast
-import re
 import numpy as np
 import pandas as pd
 from tqdm import tqdm
+from src.modeling.dataset_store import parse_similar_raw
 from src.modeling.lightGBM import load_resources, get_recommendations
 
-def parse_similar_raw(x):
-    """Unwrap deeply nested or triple-encoded similar_questions safely."""
-    if not isinstance(x, str) or not x.strip() or x.strip() in ["[]", "nan"]:
-        return []
-
-    s = x.strip()
-    for _ in range(5):
-        try:
-            data = ast.literal_eval(s)
-        except Exception:
-            break
-
-        if isinstance(data, list) and len(data) == 1 and isinstance(data[0], str):
-            s = data[0]
-            continue
-
-        if isinstance(data, list) and all(isinstance(i, str) for i in data):
-            cleaned = []
-            for i in data:
-                i = re.sub(r"^['\"\[]+|['\"\]]+$", "", i).strip()
-                if i:
-                    cleaned.append(i.lower())
-            return cleaned
-
-        if isinstance(data, str) and ("[" in data and "]" in data):
-            s = data
-            continue
-
-        break
-
-    return []
-
-
 def precision_at_k(recommended, ground_truth, k):
     hits = len(set(recommended[:k]) & set(ground_truth))
     return hits / k if k > 0 else 0
@@ -67,37 +33,38 @@ def intra_list_diversity(embeddings, rec_indices):
     return 1.0 - float(np.mean(sims))  # higher = more diverse
 
 def evaluate_model(
-    df,
+    catalog,
     embeddings,
-    tag_sims,
-    diff_sims,
+    similarity,
     pop_score,
     model,
     k=10,
     limit=300,
     use_mmr=False,
     lambda_diversity=0.5,
+    index=None,
 ):
     P, R, N, D = [], [], [], []
-    total = min(limit, len(df))
+    total = min(limit, len(catalog))
+    similar_questions = catalog.column("similar_questions")
 
     for i in tqdm(range(total), desc=f"Evaluating {'MMR' if use_mmr else 'Base'}"):
-        gt_raw = df.loc[i, "similar_questions"]
+        gt_raw = similar_questions[i]
         gt = parse_similar_raw(gt_raw)
         if not gt:
             continue
 
         recs = get_recommendations(
             i,
-            df,
+            catalog,
             embeddings,
-            tag_sims,
-            diff_sims,
+            similarity,
             pop_score,
             model,
             k=k,
             use_mmr=use_mmr,
             lambda_diversity=lambda_diversity,
+            index=index,
         )
 
         rec_titles = [t.lower().strip() for t in recs["title"].tolist()]
@@ -127,11 +94,11 @@ def evaluate_model(
 
 if __name__ == "__main__":
     print("[INFO] Loading resources...")
-    df, emb, tag_sims, diff_sims, pop_score, model = load_resources()
+    catalog, emb, similarity, pop_score, model, index = load_resources()
 
     print("\n[INFO] Evaluating Base LambdaRank model...")
     base_metrics = evaluate_model(
-        df, emb, tag_sims, diff_sims, pop_score, model, k=10, limit=300, use_mmr=False
+        catalog, emb, similarity, pop_score, model, k=10, limit=300, use_mmr=False, index=index
     )
     print("\nBase LambdaRank:")
     for k_name, v in base_metrics.items():
@@ -139,7 +106,7 @@ if __name__ == "__main__":
 
     print("\n[INFO] Evaluating LambdaRank + MMR model...")
     mmr_metrics = evaluate_model(
-        df, emb, tag_sims, diff_sims, pop_score, model, k=10, limit=300, use_mmr=True
+        catalog, emb, similarity, pop_score, model, k=10, limit=300, use_mmr=True, index=index
     )
     print("\nLambdaRank + MMR:")
     for k_name, v in mmr_metrics.items():
@@ -155,16 +122,16 @@ if __name__ == "__main__":
     print("\n[TUNING] Searching for best λ-diversity...")
     for lam in lambda_values:
         metrics = evaluate_model(
-            df,
+            catalog,
             emb,
-            tag_sims,
-            diff_sims,
+            similarity,
             pop_score,
             model,
             k=10,
             limit=300,
             use_mmr=True,
             lambda_diversity=lam,
+            index=index,
         )
         print(f"λ={lam:.1f} -> NDCG={metrics['NDCG@K']:.4f}, ILD={metrics['ILD']:.4f}")
         results.append((lam, metrics["NDCG@K"], metrics["ILD"]))
@@ -0,0 +1,156 @@
+# src/modeling/features.py
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.modeling.tag_index import TagIndex
+
+DIFFICULTY_LADDER = {"easy": 0, "medium": 1, "hard": 2}
+# diff_sim by |difficulty gap|: same level, one step apart, two steps apart
+DIFF_SIM_BY_GAP = np.array([1.0, 0.7, 0.4], dtype=np.float32)
+
+
+def difficulty_codes(df: pd.DataFrame) -> np.ndarray:
+    return df["difficulty"].str.lower().map(DIFFICULTY_LADDER).fillna(1).to_numpy(dtype=np.int8)
+
+
+class SimilarityProvider:
+    """On-demand pairwise similarities and LambdaRank features between problems.
+
+    Replaces the dense N x N tag / difficulty similarity matrices: only
+    per-problem arrays (difficulty codes, popularity, tag bitmasks) are kept,
+    so resident memory is linear in catalog size. Full rows are computed when
+    asked for and, with `cache_rows > 0`, the most recently used rows are kept
+    in an LRU so hot queries become gathers.
+    """
+
+    def __init__(self, diff_codes: np.ndarray, popularity: np.ndarray, tags: TagIndex, cache_rows: int = 0):
+        self.diff_codes = diff_codes
+        self.popularity = popularity.astype(np.float32)
+        self.tags = tags
+        self.cache_rows = cache_rows
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.diff_codes)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, popularity_score: np.ndarray, cache_rows: int = 0) -> "SimilarityProvider":
+        tag_lists = df["tag_list"] if "tag_list" in df.columns else [[]] * len(df)
+        return cls(difficulty_codes(df), np.asarray(popularity_score), TagIndex.from_lists(tag_lists), cache_rows)
+
+    def tag_jaccard(self, idx: int, cand_idx: np.ndarray) -> np.ndarray:
+        return self.tags.jaccard(idx, cand_idx)
+
+    def diff_sim(self, idx: int, cand_idx: np.ndarray) -> np.ndarray:
+        gap = np.abs(self.diff_codes[cand_idx].astype(np.int16) - int(self.diff_codes[idx]))
+        return DIFF_SIM_BY_GAP[np.minimum(gap, 2)]
+
+    def pop_diff(self, idx: int, cand_idx: np.ndarray) -> np.ndarray:
+        return np.abs(self.popularity[cand_idx] - self.popularity[idx])
+
+    def _cached_rows(self, idx: int):
+        with self._lock:
+            rows = self._rows.get(idx)
+            if rows is not None:
+                self._rows.move_to_end(idx)
+                self.hits += 1
+                return rows
+            self.misses += 1
+        everything = np.arange(len(self))
+        rows = (self.tag_jaccard(idx, everything).astype(np.float32), self.diff_sim(idx, everything))
+        if self.cache_rows > 0:
+            with self._lock:
+                self._rows[idx] = rows
+                while len(self._rows) > self.cache_rows:
+                    self._rows.popitem(last=False)
+        return rows
+
+    def tag_row(self, idx: int) -> np.ndarray:
+        """Tag Jaccard of problem `idx` against the whole catalog, shape (N,)."""
+        return self._cached_rows(idx)[0]
+
+    def diff_row(self, idx: int) -> np.ndarray:
+        """Difficulty similarity of problem `idx` against the whole catalog, shape (N,)."""
+        return self._cached_rows(idx)[1]
+
+    def pair(self, i: int, j: int):
+        """(tag_sim, diff_sim) for a single pair of problems."""
+        j_arr = np.array([j])
+        return float(self.tag_jaccard(i, j_arr)[0]), float(self.diff_sim(i, j_arr)[0])
+
+    def compute(self, idx: int, cand_idx: np.ndarray, cand_sims: np.ndarray) -> np.ndarray:
+        """(m, 4) float32 matrix of [emb_sim, tag_sim, diff_sim, pop_diff]."""
+        cand_idx = np.asarray(cand_idx, dtype=np.int64)
+        feats = np.empty((len(cand_idx), 4), dtype=np.float32)
+        feats[:, 0] = cand_sims
+        if self.cache_rows > 0:
+            tag_row, diff_row = self._cached_rows(idx)
+            feats[:, 1] = tag_row[cand_idx]
+            feats[:, 2] = diff_row[cand_idx]
+        else:
+            feats[:, 1] = self.tag_jaccard(idx, cand_idx)
+            feats[:, 2] = self.diff_sim(idx, cand_idx)
+        feats[:, 3] = self.pop_diff(idx, cand_idx)
+        return feats
+
+    @property
+    def nbytes(self) -> int:
+        base = self.diff_codes.nbytes + self.popularity.nbytes + self.tags.bits.nbytes
+        return int(base + sum(t.nbytes + d.nbytes for t, d in self._rows.values()))
+
+
+def reference_features(idx, cand_idx, cand_sims, df, popularity_score) -> np.ndarray:
+    """Original per-candidate loop, kept as the parity reference for SimilarityProvider."""
+    diff_vals = difficulty_codes(df)
+    query_tags = set(df.iloc[idx].get("tag_list", []))
+    rows = []
+    for pos, j in enumerate(cand_idx):
+        cand_tags = set(df.iloc[j].get("tag_list", []))
+        tag_sim = float(len(query_tags & cand_tags) / len(query_tags | cand_tags)) if (query_tags and cand_tags) else 0.0
+        gap = abs(int(diff_vals[idx]) - int(diff_vals[j]))
+        diff_sim = 1.0 if gap == 0 else 0.7 if gap == 1 else 0.4
+        pop_diff = float(abs(float(popularity_score[idx]) - float(popularity_score[j])))
+        rows.append([float(cand_sims[pos]), tag_sim, diff_sim, pop_diff])
+    return np.array(rows, dtype=np.float32).reshape(-1, 4)
+
+
+def check_parity(df, embeddings, popularity_score, features: SimilarityProvider, index, n_queries: int = 200,
+                 m: int = 300, seed: int = 0) -> float:
+    """Max absolute difference between vectorized and reference features over random queries."""
+    rng = np.random.RandomState(seed)
+    worst = 0.0
+    for q in rng.choice(len(df), min(n_queries, len(df)), replace=False):
+        cand_idx, cand_sims = index.neighbors(int(q), m)
+        fast = features.compute(int(q), cand_idx, cand_sims)
+        ref = reference_features(int(q), cand_idx, cand_sims, df, popularity_score)
+        worst = max(worst, float(np.abs(fast - ref).max()) if len(ref) else 0.0)
+    return worst
+
+
+if __name__ == "__main__":
+    import time
+    from src.modeling.lightGBM import load_resources
+
+    catalog, emb, features, pop, _, index = load_resources()
+    df = catalog.frame
+    print(f"Max |vectorized - reference| over 200 queries: {check_parity(df, emb, pop, features, index):.3e}")
+
+    cand_idx, cand_sims = index.neighbors(0, 300)
+    for name, fn in (("reference", lambda: reference_features(0, cand_idx, cand_sims, df, pop)),
+                     ("vectorized", lambda: features.compute(0, cand_idx, cand_sims))):
+        t0 = time.perf_counter()
+        for _ in range(20):
+            fn()
+        print(f"{name:>10}: {(time.perf_counter() - t0) / 20 * 1000:.3f} ms per 300 candidates")
+
+    tags = features.tags
+    pair = tags.vocab[:2]
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        hits = tags.having(pair)
+    print(f"having({pair}): {len(hits)} problems in {(time.perf_counter() - t0) / 1000 * 1e6:.1f} us")
@@ -1,36 +1,28 @@
 # src/modeling/lightGBM.py
 import os
-import re
-import ast
+import hashlib
 import pickle
 from pathlib import Path
+from typing import List, NamedTuple
 import inspect
 
 import numpy as np
 import pandas as pd
 import lightgbm as lgb
 
+from src.modeling.ann_index import BruteForceIndex, embeddings_fingerprint, load_or_build_index, load_neighbor_table
+from src.modeling.embedding_store import normalize_rows, open_store
+from src.modeling.catalog import ProblemCatalog
+from src.modeling.dataset_store import bundle_path, clean_title, load_dataset, to_tag_list
+from src.modeling.compiled_booster import compile_booster
+from src.modeling.features import SimilarityProvider
+from src.modeling.mmr import mmr_select
+
 try:
     print("[DEBUG] API using lightGBM from:", inspect.getfile(inspect.currentframe()))
 except Exception:
     pass
 
-def clean_title(text: str) -> str:
-    text = str(text).lower().strip()
-    text = re.sub(r'^\d+\.\s*', '', text)
-    text = re.sub(r'[^a-z0-9\s\-]', '', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
-
-def to_tag_list(s) -> list:
-    if isinstance(s, str) and s.strip().startswith('['):
-        try:
-            vals = ast.literal_eval(s)
-            return [str(v).lower().strip() for v in vals if v]
-        except Exception:
-            pass
-    return [t.strip().lower() for t in str(s).split(',') if t.strip()]
-
 def minmax(x: pd.Series) -> pd.Series:
     x = x.fillna(0)
     rng = x.max() - x.min()
@@ -41,54 +33,254 @@ def tag_jaccard_set(a: set, b: set) -> float:
         return 0.0
     return float(len(a & b) / len(a | b))
 
-def load_resources():
+def load_embeddings(emb_path, store_path=None):
+    """Return (L2-normalized float32 embeddings, fingerprint).
+
+    Prefers the memory-mapped store at `store_path` (shared page cache across
+    workers, no copy); falls back to unpickling `emb_path` when the store is
+    missing or older than the pickle.
+    """
+    emb_path = Path(emb_path)
+    if store_path is not None and Path(store_path).exists():
+        store_path = Path(store_path)
+        if emb_path.exists() and emb_path.stat().st_mtime > store_path.stat().st_mtime:
+            print(f"[WARN] {emb_path.name} is newer than {store_path.name}; re-run src.modeling.embedding_store to convert it.")
+        else:
+            return open_store(store_path)
+
+    if not emb_path.exists():
+        raise FileNotFoundError(f"Embeddings cache not found: {emb_path}")
+    with open(emb_path, "rb") as f:
+        cache = pickle.load(f)
+    embeddings = normalize_rows(cache.get("embeddings"))
+    return embeddings, embeddings_fingerprint(embeddings)
+
+ARTIFACT_FILES = (
+    "data/processed/preprocessed_data.csv",
+    "data/processed/preprocessed_data.npz",
+    "models/sbert_embeddings.bin",
+    "models/sbert_recommender.pkl",
+    "models/sbert_neighbors_meta.json",
+    "models/rec_store_meta.json",
+    "models/lambdarank_model.txt",
+)
+
+def artifact_version(base_dir=None) -> str:
+    """Short hash of the size/mtime of every serving artifact; changes whenever the pipeline rewrites one."""
+    base_dir = Path(base_dir) if base_dir is not None else Path(__file__).resolve().parents[2]
+    h = hashlib.sha1()
+    for rel in ARTIFACT_FILES:
+        path = base_dir / rel
+        if path.exists():
+            st = path.stat()
+            h.update(f"{rel}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()[:12]
+
+MODEL_BACKENDS = ("lightgbm", "compiled")
+
+def load_model(model_txt, backend: str = "lightgbm"):
+    """LambdaRank booster, or with backend="compiled" its NumPy-compiled evaluator (same predict())."""
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend {backend!r}; expected one of {MODEL_BACKENDS}.")
+    booster = lgb.Booster(model_file=str(model_txt))
+    if backend == "lightgbm":
+        return booster
+    try:
+        # compile LightGBM's own serialization so model_to_string() (and fingerprints) match the booster
+        return compile_booster(booster.model_to_string())
+    except ValueError as e:
+        print(f"[WARN] Cannot compile {Path(model_txt).name} ({e}); using lightgbm.")
+        return booster
+
+# what the catalog, similarity features and popularity score read (skips descriptions etc.)
+RESOURCE_COLUMNS = ["frontend_id", "title", "titleSlug", "difficulty", "is_premium", "topic_tags",
+                    "similar_questions", "acceptance", "likes", "submission", "clean_title", "tag_list"]
+
+def load_resources(index_type: str = "auto", use_neighbor_table: bool = True, quantization=None,
+                   similarity_cache_rows: int = 0, model_backend: str = "lightgbm", return_fingerprint: bool = False):
+    """(catalog, embeddings, similarity, popularity_score, model, index).
+
+    With return_fingerprint=True the embeddings fingerprint (read from the
+    store header, not recomputed) is appended, for validating derived artifacts.
+    """
     BASE_DIR = Path(__file__).resolve().parents[2]
     data_path = BASE_DIR / "data" / "processed" / "preprocessed_data.csv"
     emb_path  = BASE_DIR / "models" / "sbert_recommender.pkl"
+    store_path = BASE_DIR / "models" / "sbert_embeddings.bin"
+    index_path = BASE_DIR / "models" / "sbert_ivf_index.npz"
     model_txt = BASE_DIR / "models" / "lambdarank_model.txt"
 
-    if not data_path.exists():
+    if not data_path.exists() and not bundle_path(data_path).exists():
         raise FileNotFoundError(f"Data file not found: {data_path}")
 
-    df = pd.read_csv(data_path)
-    df["clean_title"] = df["title"].apply(clean_title)
-    df["tag_list"] = df["topic_tags"].apply(to_tag_list)
+    df = load_dataset(data_path, RESOURCE_COLUMNS)
     df["difficulty"] = df["difficulty"].fillna("Medium")
-    if not emb_path.exists():
-        raise FileNotFoundError(f"Embeddings cache not found: {emb_path}")
-    with open(emb_path, "rb") as f:
-        cache = pickle.load(f)
-    embeddings = np.array(cache.get("embeddings"), dtype=np.float32)
+    embeddings, fingerprint = load_embeddings(emb_path, store_path)
 
     if embeddings.shape[0] != len(df):
         raise RuntimeError(f"Embedding rows ({embeddings.shape[0]}) != dataframe rows ({len(df)}). Regenerate embeddings.")
-    if np.isnan(embeddings).any():
-        raise RuntimeError("Embeddings contain NaNs.")
 
-    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-    norms[norms == 0] = 1.0
-    embeddings = embeddings / norms.astype(np.float32)
+    index = load_or_build_index(
+        embeddings, index_type=index_type, index_path=index_path, fingerprint=fingerprint, quantization=quantization
+    )
+    if use_neighbor_table:
+        index = load_neighbor_table(BASE_DIR / "models", embeddings, fallback=index, fingerprint=fingerprint)
     if not model_txt.exists():
         raise FileNotFoundError(f"LambdaRank model text file not found: {model_txt}")
-    model = lgb.Booster(model_file=str(model_txt))
-    ladder = {"easy": 0, "medium": 1, "hard": 2}
-    diff_vals = df["difficulty"].str.lower().map(ladder).fillna(1).to_numpy(dtype=np.int8)
+    model = load_model(model_txt, model_backend)
     acc = minmax(df.get("acceptance", pd.Series(np.zeros(len(df)))))
     likes = minmax(df.get("likes", pd.Series(np.zeros(len(df)))))
     subs = minmax(df.get("submission", pd.Series(np.zeros(len(df)))))
     popularity_score = (0.3 * acc + 0.5 * likes + 0.2 * subs).fillna(0).to_numpy(dtype=np.float32)
-    tag_sims = np.zeros((len(df), len(df)), dtype=np.float32)
-    diff_sims = np.ones((len(df), len(df)), dtype=np.float32)
-
-    print(f"[INFO] Loaded {len(df)} problems, embeddings {embeddings.shape}, model objective={model.params.get('objective','unknown')}")
-    return df, embeddings, tag_sims, diff_sims, popularity_score, model
+    similarity = SimilarityProvider.from_frame(df, popularity_score, cache_rows=similarity_cache_rows)
+    catalog = ProblemCatalog.from_frame(df)
+
+    print(f"[INFO] Loaded {len(df)} problems, embeddings {embeddings.shape}, index={index.kind}, model objective={model.params.get('objective','unknown')}")
+    if return_fingerprint:
+        return catalog, embeddings, similarity, popularity_score, model, index, fingerprint
+    return catalog, embeddings, similarity, popularity_score, model, index
+
+def _as_catalog(catalog):
+    """Accept a ProblemCatalog, or a DataFrame from older callers (converted per call)."""
+    if isinstance(catalog, ProblemCatalog):
+        return catalog
+    df = catalog.copy()
+    if "clean_title" not in df.columns:
+        df["clean_title"] = df["title"].apply(clean_title)
+    if "tag_list" not in df.columns:
+        df["tag_list"] = df["topic_tags"].apply(to_tag_list)
+    return ProblemCatalog.from_frame(df)
+
+def _rerank_features(idx, cand_idx, cand_sims, catalog, popularity_score, similarity=None):
+    """LambdaRank features [emb_sim, tag_sim, diff_sim, pop_diff] for one query's candidates."""
+    if similarity is None:
+        similarity = _similarity_for(catalog, popularity_score)
+    return similarity.compute(idx, cand_idx, cand_sims)
+
+def _similarity_for(catalog, popularity_score):
+    frame = pd.DataFrame({"difficulty": catalog.difficulty, "tag_list": catalog.tag_list})
+    return SimilarityProvider.from_frame(frame, popularity_score)
+
+def _jitter(scores):
+    rng = np.random.RandomState(42)
+    return scores + rng.normal(0, 1e-8, size=scores.shape)
+
+class ScoredCandidates(NamedTuple):
+    """Stage-1 candidates of one query with their rerank features and raw LambdaRank scores.
+
+    Candidates are ordered best retrieval match first, so a smaller pool is a prefix.
+    """
+    idx: int
+    cand_idx: np.ndarray   # (m,) catalog rows
+    cand_sims: np.ndarray  # (m,) embedding similarity
+    features: np.ndarray   # (m, 4) [emb_sim, tag_sim, diff_sim, pop_diff]
+    scores: np.ndarray     # (m,) model.predict(features)
+
+def score_candidates(idx, catalog, embeddings, popularity_score, model, candidate_pool=400, index=None,
+                     similarity=None, mask=None) -> ScoredCandidates:
+    """Retrieve, featurize and score one query's candidate pool; both serving modes are views over this.
+
+    `mask` (bool per catalog row) is pushed into retrieval, so the pool holds
+    only eligible problems and stays full as long as enough of them exist.
+    """
+    return score_candidates_batch(
+        np.array([idx], dtype=np.int64), [candidate_pool], catalog, embeddings, popularity_score, model,
+        index=index, similarity=similarity, mask=mask,
+    )[0]
+
+def score_candidates_batch(idxs, pools, catalog, embeddings, popularity_score, model, index=None,
+                           similarity=None, mask=None) -> List[ScoredCandidates]:
+    """score_candidates for many queries with one retrieval and one model call."""
+    catalog = _as_catalog(catalog)
+    N = len(catalog)
+    if index is None:
+        index = BruteForceIndex(embeddings)
+    if similarity is None:
+        similarity = _similarity_for(catalog, popularity_score)
+    pools = [max(1, min(p, N - 1)) for p in pools]
+    if mask is not None or len(pools) == 1:
+        # filtered pools differ in length per query, so these go through neighbors() one by one
+        found = [index.neighbors(int(i), p) if mask is None else index.neighbors(int(i), p, mask=mask)
+                 for i, p in zip(idxs, pools)]
+        cand_ids = [ids for ids, _ in found]
+        cand_sims = [sims for _, sims in found]
+    else:
+        # rows come back best-first, so each query's pool is a prefix of the widest one
+        cand_ids, cand_sims = index.batch_neighbors(idxs, max(pools))
+
+    blocks = [
+        _rerank_features(int(i), cand_ids[b][:pools[b]], cand_sims[b][:pools[b]], catalog, popularity_score, similarity)
+        for b, i in enumerate(idxs)
+    ]
+    offsets = np.cumsum([0] + [len(blk) for blk in blocks])
+    all_scores = model.predict(np.vstack(blocks)) if offsets[-1] else np.empty(0)
+    return [
+        ScoredCandidates(int(i), np.asarray(cand_ids[b][:len(blocks[b])], dtype=np.int64),
+                         cand_sims[b][:len(blocks[b])], blocks[b], all_scores[offsets[b]:offsets[b + 1]])
+        for b, i in enumerate(idxs)
+    ]
+
+def _select_recommendations(embeddings, cand_idx, scores, k, use_mmr, lambda_diversity):
+    """Pick the final k candidates; returns (catalog rows, scores) as arrays."""
+    if use_mmr:
+        chosen = mmr_select(scores, embeddings[cand_idx], k, lambda_diversity)
+    else:
+        chosen = np.argsort(scores)[-k:][::-1]
+    return np.asarray(cand_idx, dtype=np.int64)[chosen], np.asarray(scores, dtype=np.float64)[chosen]
+
+def recommendations_from(scored: ScoredCandidates, embeddings, k=10, use_mmr=True, lambda_diversity=0.6,
+                         candidate_pool=300):
+    """Recommendation view: (rows, scores) chosen from the first `candidate_pool` scored candidates."""
+    pool = min(candidate_pool, len(scored.scores))
+    if pool == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    scores = _jitter(scored.scores[:pool])
+    return _select_recommendations(embeddings, scored.cand_idx[:pool], scores, k, use_mmr, lambda_diversity)
+
+def recommendation_frame(catalog, rows, scores) -> pd.DataFrame:
+    """DataFrame view of selected recommendations (columns as returned by get_recommendations)."""
+    rows = np.asarray(rows, dtype=np.int64)
+    return pd.DataFrame({
+        "frontend_id": catalog.frontend_id[rows],
+        "title": catalog.title[rows],
+        "difficulty": catalog.difficulty[rows],
+        "topic_tags": catalog.topic_tags[rows],
+        "problem_URL": catalog.problem_URL[rows],
+        "score": np.asarray(scores, dtype=np.float64),
+        "df_idx": rows,
+    })
+
+def get_recommendation_rows(
+    idx: int,
+    catalog,
+    embeddings: np.ndarray,
+    similarity: SimilarityProvider,
+    popularity_score: np.ndarray,
+    model: lgb.Booster,
+    k: int = 10,
+    use_mmr: bool = True,
+    lambda_diversity: float = 0.6,
+    candidate_pool: int = 300,
+    debug: bool = False,
+    index=None,
+    mask=None,
+):
+    """Same as get_recommendations but returns (catalog rows, scores) arrays, skipping pandas."""
+    catalog = _as_catalog(catalog)
+    assert embeddings.shape[0] == len(catalog), "Embeddings length mismatch."
+    scored = score_candidates(
+        idx, catalog, embeddings, popularity_score, model, candidate_pool=candidate_pool, index=index,
+        similarity=similarity, mask=mask,
+    )
+    if debug and scored.features.size:
+        print(f"[DEBUG] query_idx={idx}, candidates={len(scored.cand_idx)}, feat_mean={scored.features.mean(axis=0)}, feat_std={scored.features.std(axis=0)}")
+    return recommendations_from(scored, embeddings, k, use_mmr, lambda_diversity, candidate_pool)
 
 def get_recommendations(
     idx: int,
-    df: pd.DataFrame,
+    catalog,
     embeddings: np.ndarray,
-    tag_sims,
-    diff_sims,
+    similarity: SimilarityProvider,
     popularity_score: np.ndarray,
     model: lgb.Booster,
     k: int = 10,
@@ -96,153 +288,80 @@ def get_recommendations(
     lambda_diversity: float = 0.6,
     candidate_pool: int = 300,
     debug: bool = False,
+    index=None,
+    mask=None,
 ):
-    N = len(df)
-    assert embeddings.shape[0] == N, "Embeddings length mismatch."
-    sims = embeddings @ embeddings[idx]
-    sims = sims.astype(np.float32)
-    sims[idx] = -1.0
-
-    # candidate selection
-    m = max(1, min(candidate_pool, N - 1))
-    top_k_part = np.argpartition(sims, -m)[-m:]
-    top_idx_stage1 = top_k_part[np.argsort(sims[top_k_part])][::-1]
-    ladder = {"easy": 0, "medium": 1, "hard": 2}
-    diff_vals = df["difficulty"].str.lower().map(ladder).fillna(1).to_numpy(dtype=np.int8)
-
-    # precompute query tags once
-    raw_tags = df.iloc[idx].get("tag_list", None)
-    if isinstance(raw_tags, (list, set)):
-        query_tags = set(raw_tags)
+    """Top-k recommendations for problem row `idx`; `mask` restricts them to eligible rows (see score_candidates)."""
+    catalog = _as_catalog(catalog)
+    rows, scores = get_recommendation_rows(
+        idx, catalog, embeddings, similarity, popularity_score, model, k=k, use_mmr=use_mmr,
+        lambda_diversity=lambda_diversity, candidate_pool=candidate_pool, debug=debug, index=index, mask=mask,
+    )
+    return recommendation_frame(catalog, rows, scores)
+
+LEARNING_PATH_GROUPS = ("before", "similar", "after")
+LEARNING_PATH_GROUP_SIZE = 10
+
+def _top_n_stable(scores, n):
+    """Positions of the n largest scores, descending; equal scores keep their original order."""
+    if len(scores) > n:
+        threshold = np.partition(scores, len(scores) - n)[len(scores) - n]
+        cand = np.flatnonzero(scores >= threshold)
     else:
-        query_tags = set(to_tag_list(df.iloc[idx].get("topic_tags", "")))
-
-    rerank_feats = []
-    for j in top_idx_stage1:
-        cand_tags_raw = df.iloc[j].get("tag_list", None)
-        cand_tags = set(cand_tags_raw) if isinstance(cand_tags_raw, (list, set)) else set(to_tag_list(df.iloc[j].get("topic_tags", "")))
-        tag_sim = tag_jaccard_set(query_tags, cand_tags)
-        diff_sim = 1.0 if abs(int(diff_vals[idx]) - int(diff_vals[j])) == 0 else 0.7 if abs(int(diff_vals[idx]) - int(diff_vals[j])) == 1 else 0.4
-        pop_diff = float(abs(float(popularity_score[idx]) - float(popularity_score[j])))
-        emb_sim = float(sims[j])
-        rerank_feats.append([emb_sim, tag_sim, diff_sim, pop_diff])
-
-    rerank_feats = np.array(rerank_feats, dtype=np.float32)
-    if rerank_feats.size == 0:
-        empty = pd.DataFrame(columns=["frontend_id", "title", "difficulty", "topic_tags", "problem_URL", "score", "df_idx"])
-        return empty
-
-    if debug:
-        print(f"[DEBUG] query_idx={idx}, candidates={len(top_idx_stage1)}, feat_mean={rerank_feats.mean(axis=0)}, feat_std={rerank_feats.std(axis=0)}")
-
-    scores = model.predict(rerank_feats)
-    rng = np.random.RandomState(42)
-    scores = scores + rng.normal(0, 1e-8, size=scores.shape)
-
-    if use_mmr:
-        selected_local = []
-        candidate_indices = list(range(len(top_idx_stage1)))  # local positions into top_idx_stage1 / rerank_feats
-        cand_embs = embeddings[top_idx_stage1]                # shape (m, D)
-        relevance = scores.astype(np.float32)                # shape (m,)
-
-        while len(selected_local) < k and candidate_indices:
-            if not selected_local:
-                pick_pos = int(np.argmax(relevance[candidate_indices]))
-                pick_local = candidate_indices[pick_pos]
-            else:
-                sel_embs = cand_embs[selected_local]          # (s, D)
-                cand_subset = cand_embs[candidate_indices]    # (c, D)
-
-                sim_to_selected = cand_subset @ sel_embs.T    # (c, s)
-                max_sim = np.max(sim_to_selected, axis=1)     # (c,)
-                mmr_scores = (1 - lambda_diversity) * relevance[candidate_indices] - lambda_diversity * max_sim
-                pick_pos = int(np.argmax(mmr_scores))
-                pick_local = candidate_indices[pick_pos]
-
-            selected_local.append(pick_local)
-            candidate_indices.remove(pick_local)
-
-        chosen = selected_local
-    else:
-        chosen_local = np.argsort(scores)[-k:][::-1]
-        chosen = list(chosen_local)
-
-
-    chosen_df_idx = [int(top_idx_stage1[c]) for c in chosen]
-    chosen_scores = [float(scores[c]) for c in chosen]
-
-    recs = df.loc[chosen_df_idx, ["frontend_id", "title", "difficulty", "topic_tags"]].copy()
-    recs = recs.reset_index(drop=True)
-    recs["problem_URL"] = recs["title"].apply(lambda t: f"https://leetcode.com/problems/{clean_title(t).replace(' ', '-')}/")
-    recs["score"] = chosen_scores
-    recs["df_idx"] = chosen_df_idx
-
-    return recs
-
-def get_learning_path(idx, df, embeddings, popularity_score, model, candidate_pool=400, lambda_diversity=0.6):
-    diff_map = {"easy": 1, "medium": 2, "hard": 3}
-    curr_diff = df.iloc[idx]["difficulty"].lower()
-    curr_level = diff_map.get(curr_diff, 2)
-
-    sims = embeddings @ embeddings[idx]
-    sims[idx] = -1.0
-    top_idx = np.argpartition(sims, -candidate_pool)[-candidate_pool:]
-    top_idx = top_idx[np.argsort(sims[top_idx])][::-1]
-
-    query_tags = set(df.iloc[idx].get("tag_list", []))
-    rerank_feats = []
-    ladder = {"easy": 0, "medium": 1, "hard": 2}
-    diff_vals = df["difficulty"].str.lower().map(ladder).fillna(1).to_numpy(dtype=np.int8)
-
-    for j in top_idx:
-        cand_tags = set(df.iloc[j].get("tag_list", []))
-        tag_overlap = query_tags & cand_tags
-        tag_sim = len(tag_overlap) / len(query_tags | cand_tags) if (query_tags and cand_tags) else 0
-        diff_sim = 1.0 if diff_vals[idx] == diff_vals[j] else 0.7 if abs(diff_vals[idx] - diff_vals[j]) == 1 else 0.4
-        pop_diff = abs(popularity_score[idx] - popularity_score[j])
-        emb_sim = sims[j]
-        rerank_feats.append([emb_sim, tag_sim, diff_sim, pop_diff])
-
-    rerank_feats = np.array(rerank_feats, dtype=np.float32)
-    scores = model.predict(rerank_feats)
-    ranked = sorted(zip(top_idx, scores), key=lambda x: x[1], reverse=True)
-
-    before, similar, after = [], [], []
-    for j, sc in ranked:
-        d = df.iloc[j]["difficulty"].lower()
-        lvl = diff_map.get(d, 2)
-        if lvl < curr_level:
-            before.append((j, sc))
-        elif lvl == curr_level:
-            similar.append((j, sc))
-        else:
-            after.append((j, sc))
-
-    def explain(j, rel):
-        overlap = query_tags & set(df.iloc[j].get("tag_list", []))
-        overlap_str = ", ".join(list(overlap)[:2]) if overlap else None
+        cand = np.arange(len(scores))
+    return cand[np.argsort(-scores[cand], kind="stable")][:n]
+
+def _learning_path_slots(idx, catalog, cand_idx, scores, embeddings=None, lambda_diversity=0.6):
+    """Split candidates into before/similar/after (rows, scores) groups of at most 10, best first.
+
+    With `embeddings`, each group's 10 are chosen by MMR instead of by score alone.
+    """
+    cand_idx = np.asarray(cand_idx, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+    levels = catalog.difficulty_code[cand_idx]
+    curr_level = catalog.difficulty_code[idx]
+    n = LEARNING_PATH_GROUP_SIZE
+
+    groups = []
+    for mask in (levels < curr_level, levels == curr_level, levels > curr_level):
+        pos = np.flatnonzero(mask)
+        if embeddings is None:
+            pos = pos[_top_n_stable(scores[pos], n)]
+        elif len(pos) > 1:
+            pos = pos[np.argsort(-scores[pos], kind="stable")]
+            pos = pos[mmr_select(scores[pos], embeddings[cand_idx[pos]], n, lambda_diversity)]
+        groups.append((cand_idx[pos], scores[pos]))
+    return groups
+
+def _learning_path_dict(idx, catalog, before, similar, after, tags=None):
+    """Format (rows, scores) groups; `tags` (a TagIndex) finds shared topics from bitmasks."""
+    def explain(rows, rel):
         if rel == "before":
             msg = "helps you build core concepts before attempting this problem"
         elif rel == "similar":
             msg = "shares a similar approach and complexity"
         else:
             msg = "builds upon the same ideas and takes them to an advanced level"
-        if overlap_str:
-            msg += f" (topics: {overlap_str})"
-        return msg
+        if tags is not None:
+            shared = tags.shared(idx, rows, limit=2)
+        else:
+            query_tags = set(catalog.tag_list[idx])
+            shared = [sorted(query_tags & set(catalog.tag_list[j]))[:2] for j in rows]
+        return [msg + f" (topics: {', '.join(s)})" if s else msg for s in shared]
 
     # assemble structured output
     def build_group(group, rel):
+        rows, scores = group
         return [
             {
-                "frontend_id": int(df.iloc[j]["frontend_id"]),
-                "title": df.iloc[j]["title"],
-                "difficulty": df.iloc[j]["difficulty"],
-                "tags": df.iloc[j]["tag_list"],
-                "reason": explain(j, rel),
+                "frontend_id": int(catalog.frontend_id[j]),
+                "title": catalog.title[j],
+                "difficulty": catalog.difficulty[j],
+                "tags": catalog.tag_list[j],
+                "reason": reason,
                 "score": float(sc)
             }
-            for j, sc in group[:10]
+            for j, sc, reason in zip(rows, scores, explain(rows, rel))
         ]
 
     return {
@@ -251,15 +370,176 @@ def get_learning_path(idx, df, embeddings, popularity_score, model, candidate_po
         "after": build_group(after, "after"),
     }
 
+def learning_path_from(scored: ScoredCandidates, catalog, embeddings=None, lambda_diversity=0.6, similarity=None,
+                       candidate_pool=400):
+    """Learning-path view over the first `candidate_pool` scored candidates."""
+    pool = min(candidate_pool, len(scored.scores))
+    slots = _learning_path_slots(
+        scored.idx, catalog, scored.cand_idx[:pool], scored.scores[:pool], embeddings, lambda_diversity
+    )
+    tags = similarity.tags if similarity is not None else None
+    return _learning_path_dict(scored.idx, catalog, *slots, tags=tags)
+
+def get_learning_path(idx, catalog, embeddings, popularity_score, model, candidate_pool=400, lambda_diversity=0.6,
+                      index=None, similarity=None, use_mmr=False, mask=None):
+    catalog = _as_catalog(catalog)
+    if similarity is None:
+        similarity = _similarity_for(catalog, popularity_score)
+    scored = score_candidates(
+        idx, catalog, embeddings, popularity_score, model, candidate_pool=candidate_pool, index=index,
+        similarity=similarity, mask=mask,
+    )
+    return learning_path_from(
+        scored, catalog, embeddings if use_mmr else None, lambda_diversity, similarity, candidate_pool
+    )
+
+PERSONALIZATION_STRATEGIES = ("multi_seed", "centroid")
+
+def _personal_candidates(seeds, solved, excluded, embeddings, index, candidate_pool, strategy, filtered):
+    """Candidate rows closest to the user's seeds; `excluded` rows are masked out inside retrieval."""
+    eligible = ~excluded
+    if strategy == "centroid":
+        query = embeddings[seeds].astype(np.float32).mean(axis=0)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        ids, _ = index.search(query, candidate_pool, mask=eligible)
+    else:
+        if filtered:
+            # per-seed retrieval restricted to eligible rows
+            found = [index.neighbors(int(s), candidate_pool, mask=eligible) for s in seeds]
+            seed_ids = np.concatenate([ids for ids, _ in found])
+            seed_sims = np.concatenate([sims for _, sims in found])
+        else:
+            # one batched retrieval for every seed; widening by the solved count keeps each pool full
+            seed_ids, seed_sims = index.batch_neighbors(seeds, candidate_pool + len(solved))
+        # merged by max similarity per candidate
+        best = np.full(len(embeddings), -np.inf, dtype=np.float32)
+        np.maximum.at(best, seed_ids.ravel(), seed_sims.ravel())
+        best[excluded] = -np.inf
+        pool = min(candidate_pool, int(np.isfinite(best).sum()))
+        if pool == 0:
+            return np.empty(0, dtype=np.int64)
+        ids = np.argpartition(-best, pool - 1)[:pool]
+        ids = ids[np.argsort(-best[ids], kind="stable")]
+    return np.asarray(ids, dtype=np.int64)
+
+def get_personalized_rows(
+    solved_rows,
+    catalog,
+    embeddings: np.ndarray,
+    similarity: SimilarityProvider,
+    popularity_score: np.ndarray,
+    model: lgb.Booster,
+    k: int = 10,
+    strategy: str = "multi_seed",
+    max_seeds: int = 20,
+    candidate_pool: int = 300,
+    use_mmr: bool = True,
+    lambda_diversity: float = 0.6,
+    index=None,
+    mask=None,
+):
+    """Recommendations from a user's solved problems (catalog rows, most recent first).
+
+    The most recent `max_seeds` solved problems seed retrieval, either as one
+    centroid query or as a multi-seed max-similarity merge. Solved problems
+    are masked out, along with rows outside `mask` (see
+    ProblemCatalog.filter_mask), and each candidate is featurized against its closest seed
+    so the LambdaRank model sees the same pairwise features as in
+    get_recommendations. Returns (rows, scores, anchors), where anchors[i] is
+    the solved row that rows[i] was matched to.
+    """
+    if strategy not in PERSONALIZATION_STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; expected one of {PERSONALIZATION_STRATEGIES}.")
+    catalog = _as_catalog(catalog)
+    empty = np.empty(0, dtype=np.int64)
+    solved = np.asarray(solved_rows, dtype=np.int64)
+    if len(solved) == 0:
+        return empty, np.empty(0, dtype=np.float64), empty
+    _, first = np.unique(solved, return_index=True)
+    solved = solved[np.sort(first)]
+    seeds = solved[:max_seeds]
+    if index is None:
+        index = BruteForceIndex(embeddings)
+    if similarity is None:
+        similarity = _similarity_for(catalog, popularity_score)
+
+    excluded = np.zeros(len(catalog), dtype=bool) if mask is None else ~mask
+    excluded[solved] = True
+    cand_idx = _personal_candidates(
+        seeds, solved, excluded, embeddings, index, candidate_pool, strategy, filtered=mask is not None
+    )
+    if len(cand_idx) == 0:
+        return empty, np.empty(0, dtype=np.float64), empty
+
+    seed_sims = np.asarray(embeddings[cand_idx]) @ np.asarray(embeddings[seeds]).T   # (m, s)
+    nearest = seed_sims.argmax(axis=1)
+    cand_sims = seed_sims[np.arange(len(cand_idx)), nearest].astype(np.float32)
+    feats = np.empty((len(cand_idx), 4), dtype=np.float32)
+    for s in np.unique(nearest):
+        sel = nearest == s
+        feats[sel] = _rerank_features(int(seeds[s]), cand_idx[sel], cand_sims[sel], catalog, popularity_score, similarity)
+
+    scores = _jitter(model.predict(feats))
+    rows, chosen_scores = _select_recommendations(embeddings, cand_idx, scores, k, use_mmr, lambda_diversity)
+    anchor_of = dict(zip(cand_idx.tolist(), seeds[nearest].tolist()))
+    anchors = np.array([anchor_of[r] for r in rows.tolist()], dtype=np.int64)
+    return rows, chosen_scores, anchors
+
+def get_batch_recommendations(
+    queries,
+    catalog,
+    embeddings: np.ndarray,
+    popularity_score: np.ndarray,
+    model: lgb.Booster,
+    use_mmr: bool = True,
+    lambda_diversity: float = 0.6,
+    candidate_pool: int = 300,
+    path_candidate_pool: int = 400,
+    index=None,
+    similarity=None,
+    as_frames: bool = True,
+):
+    """Serve many (idx, k, use_learning_path) queries with one retrieval and one model call.
+
+    Queries on the same problem share one scored candidate pool, so asking for
+    recommendations and the learning path of a problem costs one scoring pass.
+    Returns one result per query, in order: a learning-path dict (as from
+    get_learning_path) or recommendations -- a DataFrame as from get_recommendations,
+    or with as_frames=False the (rows, scores) arrays of get_recommendation_rows.
+    """
+    if not queries:
+        return []
+    catalog = _as_catalog(catalog)
+    if similarity is None:
+        similarity = _similarity_for(catalog, popularity_score)
+
+    pools = {}
+    for i, _, use_learning_path in queries:
+        pool = path_candidate_pool if use_learning_path else candidate_pool
+        pools[int(i)] = max(pools.get(int(i), 0), pool)
+    idxs = np.fromiter(pools, dtype=np.int64, count=len(pools))
+    scored = dict(zip(pools, score_candidates_batch(
+        idxs, list(pools.values()), catalog, embeddings, popularity_score, model, index=index, similarity=similarity
+    )))
+
+    results = []
+    for i, k, use_learning_path in queries:
+        s = scored[int(i)]
+        if use_learning_path:
+            results.append(learning_path_from(s, catalog, similarity=similarity, candidate_pool=path_candidate_pool))
+            continue
+        rows, chosen_scores = recommendations_from(s, embeddings, k, use_mmr, lambda_diversity, candidate_pool)
+        results.append(recommendation_frame(catalog, rows, chosen_scores) if as_frames else (rows, chosen_scores))
+    return results
+
 if __name__ == "__main__":
-    df, emb, tag_sims, diff_sims, pop_score, model = load_resources()
-    print("Sanity check: df rows", len(df), "emb shape", emb.shape)
+    catalog, emb, similarity, pop_score, model, index = load_resources()
+    print("Sanity check: catalog rows", len(catalog), "emb shape", emb.shape)
 
-    matches = df[df["clean_title"].str.contains("non-overlapping intervals", case=False, na=False)]
-    if not matches.empty:
-        idx = int(matches.index[0])
+    idx = catalog.row_of_title("non-overlapping intervals")
+    if idx is not None:
         print("\n=== Learning Path Test ===")
-        path = get_learning_path(idx, df, emb, pop_score, model)
+        path = get_learning_path(idx, catalog, emb, pop_score, model, index=index, similarity=similarity)
         import json
         print(json.dumps(path, indent=2))
     else:
@@ -0,0 +1,163 @@
+# src/modeling/rec_store.py
+"""Materialized default-parameter recommendations and learning paths.
+
+One fixed-width record per catalog row, written by the pipeline and
+memory-mapped by the API, so default requests are served without retrieval
+or model calls:
+
+    rec_rows     int32[50]    MMR picks (lambda 0.6) in pick order, -1 padded
+    rec_scores   float64[50]  their LambdaRank scores
+    path_rows    int32[30]    learning-path rows, before/similar/after blocks of 10
+    path_scores  float64[30]
+    path_groups  uint8[30]    0 = before, 1 = similar, 2 = after
+
+MMR is greedy, so the first k picks of a 50-pick run are exactly the k-pick
+answer; any top_k <= 50 is a slice. Scores stay float64 so served responses
+match live scoring exactly.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from src.modeling.ann_index import embeddings_fingerprint
+from src.modeling.lightGBM import (
+    LEARNING_PATH_GROUP_SIZE,
+    _learning_path_dict,
+    _learning_path_slots,
+    recommendations_from,
+    score_candidates_batch,
+)
+
+REC_SLOTS = 50
+PATH_SLOTS = 3 * LEARNING_PATH_GROUP_SIZE
+RECORD_DTYPE = np.dtype([
+    ("rec_rows", np.int32, (REC_SLOTS,)),
+    ("rec_scores", np.float64, (REC_SLOTS,)),
+    ("path_rows", np.int32, (PATH_SLOTS,)),
+    ("path_scores", np.float64, (PATH_SLOTS,)),
+    ("path_groups", np.uint8, (PATH_SLOTS,)),
+])
+DEFAULT_DIR = Path(__file__).resolve().parents[2] / "models"
+
+
+def rec_store_paths(out_dir):
+    out_dir = Path(out_dir)
+    return out_dir / "rec_store.npy", out_dir / "rec_store_meta.json"
+
+
+def model_fingerprint(model) -> str:
+    return hashlib.sha1(model.model_to_string().encode()).hexdigest()[:16]
+
+
+def materialize_rows(rows, catalog, embeddings, similarity, popularity_score, model, index=None,
+                     lambda_diversity: float = 0.6, candidate_pool: int = 300, path_candidate_pool: int = 400,
+                     block: int = 256) -> np.ndarray:
+    """Records for catalog `rows`, scored `block` problems at a time (one scoring pass feeds both modes)."""
+    rows = np.asarray(rows, dtype=np.int64)
+    records = np.zeros(len(rows), dtype=RECORD_DTYPE)
+    records["rec_rows"] = -1
+    records["path_rows"] = -1
+    pool = max(candidate_pool, path_candidate_pool)
+
+    for start in range(0, len(rows), block):
+        chunk = rows[start:start + block]
+        scored = score_candidates_batch(
+            chunk, [pool] * len(chunk), catalog, embeddings, popularity_score, model, index=index, similarity=similarity
+        )
+        for b, s in enumerate(scored):
+            rec = records[start + b]
+            picked, picked_scores = recommendations_from(
+                s, embeddings, REC_SLOTS, True, lambda_diversity, candidate_pool
+            )
+            rec["rec_rows"][:len(picked)] = picked
+            rec["rec_scores"][:len(picked)] = picked_scores
+
+            n = min(path_candidate_pool, len(s.scores))
+            groups = _learning_path_slots(s.idx, catalog, s.cand_idx[:n], s.scores[:n])
+            for g, (group_rows, group_scores) in enumerate(groups):
+                base = g * LEARNING_PATH_GROUP_SIZE
+                rec["path_rows"][base:base + len(group_rows)] = group_rows
+                rec["path_scores"][base:base + len(group_rows)] = group_scores
+                rec["path_groups"][base:base + len(group_rows)] = g
+    return records
+
+
+class RecStore:
+    """Read side of the materialized store; returns None whenever a request needs live scoring."""
+
+    def __init__(self, records: np.ndarray, meta: dict):
+        self.records = records
+        self.meta = meta
+        self.lambda_diversity = float(meta.get("lambda_diversity", 0.6))
+
+    def __len__(self):
+        return len(self.records)
+
+    def recommendations(self, idx: int, k: int):
+        """(rows, scores) of the top-k MMR recommendations, or None if k exceeds the stored slots."""
+        if k > REC_SLOTS:
+            return None
+        rec = self.records[idx]
+        rows = rec["rec_rows"][:k]
+        n = int(np.count_nonzero(rows >= 0))
+        return rows[:n].astype(np.int64), np.array(rec["rec_scores"][:n], dtype=np.float64)
+
+    def learning_path(self, idx: int, catalog, tags=None) -> dict:
+        rec = self.records[idx]
+        groups = []
+        for g in range(3):
+            base = g * LEARNING_PATH_GROUP_SIZE
+            rows = rec["path_rows"][base:base + LEARNING_PATH_GROUP_SIZE]
+            keep = rows >= 0
+            groups.append((rows[keep].astype(np.int64), np.array(rec["path_scores"][base:base + LEARNING_PATH_GROUP_SIZE][keep])))
+        return _learning_path_dict(idx, catalog, *groups, tags=tags)
+
+
+def save_rec_store(records: np.ndarray, out_dir, embeddings: np.ndarray, model, lambda_diversity: float = 0.6,
+                   candidate_pool: int = 300, path_candidate_pool: int = 400, fingerprint: Optional[str] = None):
+    store_path, meta_path = rec_store_paths(out_dir)
+    np.save(store_path, records)
+    with open(meta_path, "w") as f:
+        json.dump({
+            "rows": int(len(records)),
+            "fingerprint": fingerprint or embeddings_fingerprint(embeddings),
+            "model": model_fingerprint(model),
+            "lambda_diversity": lambda_diversity,
+            "candidate_pool": candidate_pool,
+            "path_candidate_pool": path_candidate_pool,
+        }, f)
+
+
+def load_rec_store(embeddings: np.ndarray, model, out_dir=DEFAULT_DIR, lambda_diversity: float = 0.6,
+                   candidate_pool: int = 300, path_candidate_pool: int = 400,
+                   fingerprint: Optional[str] = None) -> Optional[RecStore]:
+    """Memory-map the store if it was built from these embeddings, this model and these parameters.
+
+    Pass the embeddings `fingerprint` when it is already known (e.g. from the
+    embedding store header); otherwise the whole matrix is hashed.
+    """
+    store_path, meta_path = rec_store_paths(out_dir)
+    if not (store_path.exists() and meta_path.exists()):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    expected = {
+        "rows": int(embeddings.shape[0]),
+        "fingerprint": fingerprint or embeddings_fingerprint(embeddings),
+        "model": model_fingerprint(model),
+        "lambda_diversity": lambda_diversity,
+        "candidate_pool": candidate_pool,
+        "path_candidate_pool": path_candidate_pool,
+    }
+    stale = [key for key, value in expected.items() if meta.get(key) != value]
+    if stale:
+        print(f"[WARN] Recommendation store at {store_path} is stale ({', '.join(stale)}); using live scoring.")
+        return None
+    records = np.load(store_path, mmap_mode="r")
+    if records.dtype != RECORD_DTYPE:
+        print(f"[WARN] Recommendation store at {store_path} has an unexpected layout; using live scoring.")
+        return None
+    return RecStore(records, meta)
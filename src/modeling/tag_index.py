@@ -0,0 +1,103 @@
+# src/modeling/tag_index.py
+from typing import Iterable, List
+
+import numpy as np
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int32)
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        as_bytes = np.ascontiguousarray(words).view(np.uint8).reshape(*words.shape[:-1], -1)
+        return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.int32)
+
+
+class TagIndex:
+    """Topic tags interned to ids and stored as one fixed-width bitmask per problem.
+
+    LeetCode has fewer than 128 topic tags, so each row is two uint64 words and
+    set operations over a candidate block are AND/OR plus popcount.
+    """
+
+    def __init__(self, vocab: List[str], bits: np.ndarray):
+        self.vocab = vocab
+        self.tag_id = {t: i for i, t in enumerate(vocab)}
+        self.bits = bits                                   # (N, W) uint64
+        self.counts = _popcount(bits)                      # (N,) tags per problem
+        # contiguous per-word columns so filters only touch the words a query uses
+        self.columns = [np.ascontiguousarray(bits[:, w]) for w in range(bits.shape[1])]
+
+    def __len__(self):
+        return self.bits.shape[0]
+
+    @property
+    def n_words(self) -> int:
+        return self.bits.shape[1]
+
+    @classmethod
+    def from_lists(cls, tag_lists: Iterable[Iterable[str]], min_words: int = 2) -> "TagIndex":
+        tag_lists = [list(tags) for tags in tag_lists]
+        vocab = sorted({t for tags in tag_lists for t in tags})
+        n_words = max(min_words, (len(vocab) + 63) // 64)
+        tag_id = {t: i for i, t in enumerate(vocab)}
+        bits = np.zeros((len(tag_lists), n_words), dtype=np.uint64)
+        for row, tags in enumerate(tag_lists):
+            for t in tags:
+                i = tag_id[t]
+                bits[row, i // 64] |= np.uint64(1 << (i % 64))
+        return cls(vocab, bits)
+
+    def encode(self, tags: Iterable[str]) -> np.ndarray:
+        """Bitmask for `tags`; raises KeyError for tags not in the catalog."""
+        mask = np.zeros(self.n_words, dtype=np.uint64)
+        for t in tags:
+            i = self.tag_id[str(t).lower().strip()]
+            mask[i // 64] |= np.uint64(1 << (i % 64))
+        return mask
+
+    def decode(self, row: int) -> List[str]:
+        return [t for i, t in enumerate(self.vocab) if int(self.bits[row, i // 64]) >> (i % 64) & 1]
+
+    def jaccard(self, idx: int, cand_idx: np.ndarray) -> np.ndarray:
+        """Tag Jaccard of row `idx` against each candidate (0 when either side has no tags)."""
+        cand = self.bits[cand_idx]
+        query = self.bits[idx]
+        inter = _popcount(cand & query).astype(np.float64)
+        union = _popcount(cand | query).astype(np.float64)
+        out = np.zeros(len(cand_idx), dtype=np.float64)
+        valid = (self.counts[cand_idx] > 0) & (self.counts[idx] > 0)
+        np.divide(inter, union, out=out, where=valid)
+        return out
+
+    def overlap(self, idx: int, cand_idx: np.ndarray) -> np.ndarray:
+        """Number of tags each candidate shares with row `idx`."""
+        return _popcount(self.bits[cand_idx] & self.bits[idx])
+
+    def shared(self, idx: int, rows, limit: int = None) -> List[List[str]]:
+        """For each of `rows`, the tags it shares with row `idx` in vocab order (at most `limit`)."""
+        query_ids = [i for i in range(len(self.vocab)) if int(self.bits[idx, i // 64]) >> (i % 64) & 1]
+        common = self.bits[np.asarray(rows, dtype=np.int64)] & self.bits[idx]
+        out = []
+        for words in common:
+            names = [self.vocab[i] for i in query_ids if int(words[i // 64]) >> (i % 64) & 1]
+            out.append(names[:limit] if limit is not None else names)
+        return out
+
+    def mask_having(self, tags: Iterable[str], match_all: bool = True) -> np.ndarray:
+        """Boolean mask of problems having all (or, with match_all=False, any) of `tags`."""
+        query = self.encode(tags)
+        mask = np.full(len(self), match_all, dtype=bool)
+        for w, q in enumerate(query):
+            if not q:
+                continue
+            if match_all:
+                mask &= (self.columns[w] & q) == q
+            else:
+                mask |= (self.columns[w] & q) != 0
+        return mask
+
+    def having(self, tags: Iterable[str], match_all: bool = True) -> np.ndarray:
+        """Row indices of problems having all (or any) of `tags`."""
+        return np.flatnonzero(self.mask_having(tags, match_all=match_all))
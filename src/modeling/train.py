@@ -1,14 +1,17 @@
-import pandas as pd
 import joblib
 import os
 from lightgbm import LGBMRegressor
 
+from src.modeling.dataset_store import load_dataset
+
+TRAIN_COLUMNS = ["acceptance", "accepted", "submission", "discussion_count", "likes", "dislikes", "likebility"]
+
 
 def train_and_save_model(processed_path="data/processed/preprocessed_data.csv",
                          model_path="models/lightgbm_model.pkl"):
     os.makedirs(os.path.dirname(model_path), exist_ok=True)
 
-    df = pd.read_csv(processed_path)
+    df = load_dataset(processed_path, TRAIN_COLUMNS)
     print(f"Loaded dataset with {df.shape[0]} rows and {df.shape[1]} columns")
 
     # You’ll replace this with your recommender logic later
@@ -0,0 +1,52 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.modeling.lightGBM import load_resources
+from src.modeling.rec_store import RECORD_DTYPE, materialize_rows, save_rec_store
+
+_resources = None
+
+
+def _init_worker():
+    global _resources
+    _resources = load_resources()
+
+
+def _materialize_chunk(rows):
+    catalog, embeddings, similarity, popularity_score, model, index = _resources
+    return rows, materialize_rows(rows, catalog, embeddings, similarity, popularity_score, model, index=index)
+
+
+def materialize_recommendations(out_dir="models", workers=None, chunk=256):
+    """Score every problem once with default parameters and write the recommendation store.
+
+    Chunks of `chunk` problems are spread over a process pool; each worker
+    loads its own copy of the resources (embeddings and neighbor table are
+    memory-mapped, so those pages are shared).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    catalog, embeddings, similarity, popularity_score, model, index, fingerprint = load_resources(return_fingerprint=True)
+    N = len(catalog)
+    workers = workers or min(os.cpu_count() or 1, max(1, N // chunk))
+
+    t0 = time.perf_counter()
+    records = np.zeros(N, dtype=RECORD_DTYPE)
+    chunks = [np.arange(start, min(start + chunk, N)) for start in range(0, N, chunk)]
+    if workers <= 1:
+        for rows in chunks:
+            records[rows] = materialize_rows(rows, catalog, embeddings, similarity, popularity_score, model, index=index)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for rows, part in pool.map(_materialize_chunk, chunks):
+                records[rows] = part
+
+    save_rec_store(records, out_dir, embeddings, model, fingerprint=fingerprint)
+    print(f"Recommendation store saved to {out_dir} ({N} problems, {records.nbytes / 1e6:.1f} MB, "
+          f"{workers} workers, {time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    materialize_recommendations()
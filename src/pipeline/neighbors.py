@@ -0,0 +1,22 @@
+import os
+import time
+
+from src.modeling.ann_index import build_neighbor_table, save_neighbor_table
+from src.modeling.lightGBM import load_embeddings
+
+
+def precompute_neighbors(emb_path="models/sbert_recommender.pkl", out_dir="models", m=400,
+                         store_path="models/sbert_embeddings.bin"):
+    """Write the (N, M) int32 neighbor / float16 similarity table used for stage-1 retrieval.
+
+    M defaults to the larger of the two candidate pools (recommendations use 300,
+    learning paths 400) so both modes are served from the table.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    embeddings, fingerprint = load_embeddings(emb_path, store_path)
+
+    t0 = time.perf_counter()
+    ids, sims = build_neighbor_table(embeddings, m=m)
+    save_neighbor_table(ids, sims, embeddings, out_dir, fingerprint=fingerprint)
+    size_mb = (ids.nbytes + sims.nbytes) / 1e6
+    print(f"Neighbor table saved to {out_dir} ({ids.shape[0]}x{ids.shape[1]}, {size_mb:.1f} MB, {time.perf_counter() - t0:.1f}s)")
@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 import os
 
+from src.modeling.dataset_store import convert_csv
+
 def convert_km_to_int(series):
     if series.dtype == 'O':
         series = (
@@ -41,4 +43,7 @@ def preprocess_data(raw_path="data/raw/leetcode_latest.csv",
         include_lowest=True, right=False
     ).apply(lambda x: (x.left // 50) + 1)
     df.to_csv(save_path, index=False)
-    print(f"Preprocessed data saved to {save_path} ({len(df)} rows)")
\ No newline at end of file
+    print(f"Preprocessed data saved to {save_path} ({len(df)} rows)")
+    # columnar copy for the readers; parsed from the CSV so both hold the same values
+    bundle = convert_csv(save_path)
+    print(f"Columnar dataset saved to {bundle}")
@@ -2,6 +2,9 @@ from src.pipeline.scraper import scrape_latest_data
 from src.pipeline.preprocess import preprocess_data
 from src.database.db_insert import insert_problems_from_csv
 from src.modeling.train import train_and_save_model
+from src.modeling.embedding_store import convert_pickle
+from src.pipeline.neighbors import precompute_neighbors
+from src.pipeline.materialize import materialize_recommendations
 
 
 def run_pipeline():
@@ -10,6 +13,8 @@ def run_pipeline():
     raw_path = "data/raw/leetcode_latest.csv"
     processed_path = "data/processed/preprocessed_data.csv"
     model_path = "models/lightgbm_model.pkl"
+    emb_path = "models/sbert_recommender.pkl"
+    store_path = "models/sbert_embeddings.bin"
 
     # 1. Scrape latest data
     print("Scraping latest LeetCode data...")
@@ -23,7 +28,19 @@ def run_pipeline():
     print("Training ML model...")
     train_and_save_model(processed_path, model_path)
 
-    # 4. Update MySQL DB
+    # 4. Convert embeddings to the memory-mapped store
+    print("Writing embedding store...")
+    convert_pickle(emb_path, store_path)
+
+    # 5. Precompute stage-1 neighbor table
+    print("Precomputing neighbor table...")
+    precompute_neighbors(emb_path, "models", store_path=store_path)
+
+    # 6. Materialize default recommendations / learning paths for every problem
+    print("Materializing recommendation store...")
+    materialize_recommendations("models")
+
+    # 7. Update MySQL DB
     print("Updating database with latest records...")
     insert_problems_from_csv(processed_path)
 
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# make `src` importable when pytest is run from anywhere in the repo
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
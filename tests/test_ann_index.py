@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from src.modeling.ann_index import (
+    AUTO_IVF_MIN_ROWS, QUANTIZE_MIN_ROWS, BruteForceIndex, IVFIndex, QuantizedIndex, load_or_build_index,
+    recall_vs_brute_force,
+)
+
+
+def loose_clusters(n, dim=32, n_topics=100, noise=1.0, seed=0):
+    """Unit vectors whose clusters overlap, so a small probe misses true neighbors."""
+    rng = np.random.RandomState(seed)
+    topics = rng.normal(size=(n_topics, dim)).astype(np.float32)
+    emb = topics[rng.randint(0, n_topics, n)] + noise * rng.normal(size=(n, dim)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+def test_explicit_ivf_falls_back_to_brute_on_small_catalogs():
+    emb = loose_clusters(500)
+    assert 500 < AUTO_IVF_MIN_ROWS
+    assert isinstance(load_or_build_index(emb, index_type="ivf"), BruteForceIndex)
+
+
+def test_tune_raises_scan_factor_until_recall_target():
+    emb = loose_clusters(3000)
+    ivf = IVFIndex.build(emb, nlist=60)
+    untuned = recall_vs_brute_force(ivf, emb, m=50, n_queries=40)
+    recall = ivf.tune(0.95, m=50, n_queries=40)
+    assert untuned < 0.95
+    assert ivf.scan_factor > 4
+    assert recall >= 0.95
+    assert recall_vs_brute_force(ivf, emb, m=50, n_queries=40, seed=1) >= 0.9
+
+
+def test_saved_index_keeps_tuned_scan_factor(tmp_path):
+    emb = loose_clusters(1000)
+    ivf = IVFIndex.build(emb, nlist=20)
+    ivf.scan_factor = 16
+    path = tmp_path / "ivf.npz"
+    ivf.save(path)
+    assert IVFIndex.load(path, emb).scan_factor == 16
+
+    # indexes saved before tuning existed are rebuilt rather than served untuned
+    np.savez(path, centroids=ivf.centroids, order=ivf.order, offsets=ivf.offsets,
+             fingerprint=np.array(ivf.fingerprint))
+    assert IVFIndex.load(path, emb) is None
+
+
+def test_int8_scan_matches_dequantized_scores_across_blocks():
+    emb = loose_clusters(1000, dim=48)
+    quant = QuantizedIndex(emb, scan_block=64)  # 1000 rows: several blocks plus a short one
+    query = emb[7]
+    expected = (quant.codes.astype(np.float64) * quant.scales) @ query
+    np.testing.assert_allclose(quant.approx_scores(query), expected, rtol=1e-4, atol=1e-5)
+    assert recall_vs_brute_force(quant, emb, m=50, n_queries=40) >= 0.95
+
+
+def test_float16_is_not_a_scan_mode():
+    emb = loose_clusters(100)
+    with pytest.raises(ValueError):
+        QuantizedIndex(emb, mode="float16")
+    with pytest.raises(ValueError):
+        load_or_build_index(emb, quantization="float16")
+
+
+def test_quantization_falls_back_to_float32_on_small_catalogs():
+    emb = loose_clusters(500)
+    assert 500 < QUANTIZE_MIN_ROWS
+    assert isinstance(load_or_build_index(emb, quantization="int8"), BruteForceIndex)
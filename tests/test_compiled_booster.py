@@ -0,0 +1,47 @@
+import lightgbm as lgb
+import numpy as np
+import pytest
+
+from src.modeling.compiled_booster import check_parity, compile_booster
+
+
+@pytest.fixture(scope="module")
+def lambdarank_model(tmp_path_factory):
+    """A small LambdaRank booster on the serving features [emb_sim, tag_sim, diff_sim, pop_diff]."""
+    rng = np.random.RandomState(0)
+    groups = [30] * 40
+    X = np.column_stack([
+        rng.uniform(-0.2, 1.0, sum(groups)),
+        rng.choice([0.0, 0.25, 0.5, 1.0], sum(groups)),
+        rng.choice([0.4, 0.7, 1.0], sum(groups)),
+        rng.rand(sum(groups)),
+    ]).astype(np.float32)
+    y = np.clip((3 * X[:, 0] + 2 * X[:, 1] + X[:, 2] + rng.normal(0, 0.3, len(X))).round(), 0, 4).astype(int)
+    params = {"objective": "lambdarank", "num_leaves": 15, "learning_rate": 0.1, "min_data_in_leaf": 5,
+              "verbose": -1, "seed": 0}
+    booster = lgb.train(params, lgb.Dataset(X, y, group=groups), num_boost_round=40)
+    path = tmp_path_factory.mktemp("model") / "lambdarank_model.txt"
+    booster.save_model(str(path))
+    return path
+
+
+def test_compiled_matches_lightgbm(lambdarank_model):
+    assert check_parity(lambdarank_model, n=3000) < 1e-9
+
+
+def test_model_to_string_round_trips(lambdarank_model):
+    text = lambdarank_model.read_text()
+    compiled = compile_booster(text)
+    assert compiled.model_to_string() == text
+    assert compiled.num_trees == lgb.Booster(model_file=str(lambdarank_model)).num_trees()
+
+
+def test_missing_value_splits_raise_value_error():
+    # NaNs in training make LightGBM emit splits with missing-value handling
+    rng = np.random.RandomState(1)
+    X = rng.rand(400, 2)
+    X[rng.rand(400) < 0.3, 0] = np.nan
+    y = (np.nan_to_num(X[:, 0], nan=0.9) > 0.5).astype(int)
+    booster = lgb.train({"objective": "binary", "verbose": -1}, lgb.Dataset(X, y), num_boost_round=3)
+    with pytest.raises(ValueError):
+        compile_booster(booster.model_to_string())
@@ -0,0 +1,75 @@
+import pytest
+
+mysql_connector = pytest.importorskip("mysql.connector")
+
+from src.database import db_config
+from src.database.explain_check import HOT_QUERIES, check_hot_queries, check_query
+
+
+@pytest.fixture(scope="module")
+def database():
+    """Skip unless a local database with the migrated schema is reachable."""
+    try:
+        with db_config.db_cursor(dictionary=True) as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) AS n FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ('users', 'interactions')"
+            )
+            tables = cursor.fetchone()["n"]
+    except (FileNotFoundError, KeyError, db_config.PoolTimeout, mysql_connector.Error) as e:
+        pytest.skip(f"no local database: {e}")
+    if tables < 2:
+        pytest.skip("database schema not migrated (run alembic upgrade head)")
+
+
+def test_hot_queries_use_their_indexes(database):
+    results = check_hot_queries()
+    assert {name: problems for name, problems in results.items() if problems} == {}
+
+
+class FakeCursor:
+    """Answers EXPLAIN and information_schema lookups from fixed plans and indexes."""
+
+    def __init__(self, possible_keys, indexes, rows=10):
+        self.possible_keys = possible_keys
+        self.indexes = indexes
+        self.rows = rows
+        self.result = []
+
+    def execute(self, sql, params=()):
+        if sql.startswith("EXPLAIN"):
+            table = "users" if "FROM users" in sql else "interactions"
+            keys = self.possible_keys[table]
+            self.result = [{"table": table, "possible_keys": ",".join(keys) or None,
+                            "key": keys[0] if keys else None, "type": "ref" if keys else "ALL", "Extra": ""}]
+        elif "STATISTICS" in sql:
+            self.result = [{"name": name, "col": col}
+                           for name, cols in self.indexes[params[0]].items() for col in cols]
+        else:
+            self.result = [{"n": self.rows}]
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+
+def test_indexes_are_matched_by_columns_not_names():
+    cursor = FakeCursor(
+        {"interactions": ["handmade"], "users": ["by_name", "by_mail"]},
+        {"interactions": {"handmade": ["problem_id", "user_id", "solved_at"]},
+         "users": {"by_name": ["username"], "by_mail": ["email"]}},
+    )
+    problems = {q.name: check_query(cursor, q) for q in HOT_QUERIES}
+    assert problems["mark-solved / is-solved lookup"] == []
+    assert problems["login lookup"] == []
+    assert problems["progress history"] == [
+        "interactions: no candidate index on (user_id, solved_at) (possible_keys=handmade)"
+    ]
+
+
+def test_full_scan_of_a_large_table_is_reported():
+    cursor = FakeCursor({"interactions": [], "users": []}, {"interactions": {}, "users": {}}, rows=50_000)
+    problems = check_query(cursor, HOT_QUERIES[0])
+    assert "interactions: full table scan" in problems
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modeling.ann_index import BruteForceIndex
+from src.modeling.features import SimilarityProvider, check_parity, reference_features
+
+TAGS = ["array", "hash table", "string", "dynamic programming", "math", "graph", "tree", "greedy"]
+
+
+def synthetic_catalog(n=120, dim=16, seed=0):
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame({
+        "difficulty": rng.choice(["Easy", "Medium", "Hard", None], n, p=[0.3, 0.4, 0.25, 0.05]),
+        # includes empty tag lists, which must give tag_sim 0
+        "tag_list": [list(rng.choice(TAGS, rng.randint(0, 4), replace=False)) for _ in range(n)],
+    })
+    embeddings = rng.normal(size=(n, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    popularity = rng.rand(n).astype(np.float32)
+    return df, embeddings, popularity
+
+
+@pytest.mark.parametrize("cache_rows", [0, 16])
+def test_similarity_provider_matches_reference(cache_rows):
+    df, embeddings, popularity = synthetic_catalog()
+    features = SimilarityProvider.from_frame(df, popularity, cache_rows=cache_rows)
+    index = BruteForceIndex(embeddings)
+    assert check_parity(df, embeddings, popularity, features, index, n_queries=40, m=50) < 1e-6
+
+
+def test_rows_and_pairs_match_reference():
+    df, embeddings, popularity = synthetic_catalog(n=40)
+    features = SimilarityProvider.from_frame(df, popularity)
+    everything = np.arange(len(df))
+    for idx in (0, 7, 39):
+        ref = reference_features(idx, everything, np.zeros(len(df)), df, popularity)
+        np.testing.assert_allclose(features.tag_row(idx), ref[:, 1], atol=1e-6)
+        np.testing.assert_allclose(features.diff_row(idx), ref[:, 2], atol=1e-6)
+        assert features.pair(idx, 3) == pytest.approx((ref[3, 1], ref[3, 2]), abs=1e-6)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from src.modeling.mmr import mmr_select, reference_mmr_select
+
+
+def unit_rows(rng, m, dim=32):
+    embs = rng.normal(size=(m, dim)).astype(np.float32)
+    return embs / np.linalg.norm(embs, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("m,k,lambda_diversity", [(50, 10, 0.6), (200, 40, 0.3), (30, 30, 0.9), (5, 10, 0.5)])
+def test_mmr_select_matches_reference(m, k, lambda_diversity):
+    rng = np.random.RandomState(m + k)
+    embs = unit_rows(rng, m)
+    scores = rng.normal(size=m)
+    assert list(mmr_select(scores, embs, k, lambda_diversity)) == reference_mmr_select(scores, embs, k, lambda_diversity)
+
+
+def test_ties_go_to_lowest_position():
+    rng = np.random.RandomState(0)
+    embs = unit_rows(rng, 20)
+    embs[10:] = embs[:10]  # duplicated candidates produce exact ties
+    scores = np.tile(rng.normal(size=10), 2)
+    assert list(mmr_select(scores, embs, 12, 0.5)) == reference_mmr_select(scores, embs, 12, 0.5)
+
+
+def test_zero_k_selects_nothing():
+    rng = np.random.RandomState(1)
+    assert len(mmr_select(rng.normal(size=5), unit_rows(rng, 5), 0, 0.5)) == 0